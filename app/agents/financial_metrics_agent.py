@@ -1,14 +1,17 @@
-from langchain_openai import OpenAI
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import PromptTemplate
-from langchain.tools import Tool
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 from app.endpoints.financial_datasets.financials import get_balance_sheets, get_income_statements
 from app.agents.financial_metrics import FinancialMetrics
 
+# LangChain and OpenAI are imported when an agent is built, not when this module loads
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
+    from langchain.tools import Tool
+
 class FinancialMetricsAgent:
     def __init__(self):
+        from langchain.memory import ConversationBufferMemory
+        from langchain_openai import OpenAI
+
         self.llm = OpenAI(temperature=0.2)
         self.metrics = FinancialMetrics()
         self.memory = ConversationBufferMemory(
@@ -18,7 +21,9 @@ class FinancialMetricsAgent:
         self.tools = self._setup_tools()
         self.agent_chain = self._setup_agent_chain()
 
-    def _setup_tools(self) -> List[Tool]:
+    def _setup_tools(self) -> List["Tool"]:
+        from langchain.tools import Tool
+
         return [
             Tool(
                 name="CalculateRatios",
@@ -27,7 +32,10 @@ class FinancialMetricsAgent:
             )
         ]
     
-    def _setup_agent_chain(self) -> AgentExecutor:
+    def _setup_agent_chain(self) -> "AgentExecutor":
+        from langchain.agents import AgentExecutor, create_react_agent
+        from langchain.prompts import PromptTemplate
+
         prompt = PromptTemplate.from_template(
             """You are a financial calculator that provides ratio calculations. You do not provide analysis or comparisons, only calculations and their explanations.
 
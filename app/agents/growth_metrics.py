@@ -0,0 +1,101 @@
+"""Trailing-twelve-month rollups and growth metrics over a quarterly series, with NumPy.
+
+Columns hold one value per quarter, oldest first, alongside ``months``
+(``year * 12 + month`` of each report period). Every result is aligned with
+the input quarters and is ``NaN`` where the history it needs is missing.
+Lags are checked against ``months``: a gap in the quarterly series makes the
+windows and comparisons that span it ``NaN`` instead of silently comparing
+the wrong quarters.
+"""
+from typing import Dict, Iterable, Mapping
+
+import numpy as np
+
+from app.agents.vectorized_metrics import STATEMENT_FIELDS
+
+Columns = Mapping[str, np.ndarray]
+
+# Income and cash-flow items, summed over four quarters for TTM; balance sheet items take the latest quarter
+FLOW_FIELDS = (
+    "revenue", "cost_of_revenue", "gross_profit", "operating_income", "ebit", "net_income",
+    "earnings_per_share", "depreciation_and_amortization", "dividends_and_other_cash_distributions",
+    "net_cash_flow_from_operations", "capital_expenditure",
+)
+ROLLUP_FIELDS = tuple(dict.fromkeys(STATEMENT_FIELDS + FLOW_FIELDS))
+
+QUARTERS_PER_YEAR = 4
+
+
+def report_months(report_periods: Iterable) -> np.ndarray:
+    return np.array([period.year * 12 + period.month for period in report_periods], dtype=np.int64)
+
+
+def is_contiguous(months: np.ndarray, lag: int) -> np.ndarray:
+    """Whether the quarter ``lag`` rows back is really ``lag`` quarters earlier (fiscal calendars drift by a month)."""
+    valid = np.zeros(len(months), dtype=bool)
+    if 0 < lag < len(months):
+        valid[lag:] = np.abs(months[lag:] - months[:-lag] - 3 * lag) <= 1
+    return valid
+
+
+def lagged(values: np.ndarray, months: np.ndarray, lag: int) -> np.ndarray:
+    """``values`` shifted ``lag`` quarters forward; ``NaN`` where that quarter is not in the series."""
+    shifted = np.full(len(values), np.nan)
+    if 0 < lag < len(values):
+        shifted[lag:] = values[:-lag]
+    return np.where(is_contiguous(months, lag), shifted, np.nan)
+
+
+def ttm_columns(c: Columns, months: np.ndarray) -> Dict[str, np.ndarray]:
+    """TTM values for every quarter: sliding four-quarter sums of the flow fields."""
+    flows = [field for field in FLOW_FIELDS if field in c]
+    ttm = {field: values for field, values in c.items() if field not in FLOW_FIELDS}
+    if not flows:
+        return ttm
+    n = len(months)
+    sums = np.full((len(flows), n), np.nan)
+    if n >= QUARTERS_PER_YEAR:
+        matrix = np.vstack([c[field] for field in flows])
+        windows = np.lib.stride_tricks.sliding_window_view(matrix, QUARTERS_PER_YEAR, axis=1)
+        sums[:, QUARTERS_PER_YEAR - 1:] = windows.sum(axis=2)
+        sums[:, ~is_contiguous(months, QUARTERS_PER_YEAR - 1)] = np.nan
+    ttm.update(zip(flows, sums))
+    return ttm
+
+
+def change(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Relative change, measured against the magnitude of ``previous`` so a shrinking loss reads as growth."""
+    return (current - previous) / np.abs(previous)
+
+
+def cagr(current: np.ndarray, start: np.ndarray, years: int) -> np.ndarray:
+    ratio = current / start
+    defined = (start > 0) & (ratio > 0)
+    return np.where(defined, np.power(np.where(defined, ratio, 1.0), 1.0 / years) - 1, np.nan)
+
+
+def growth_metrics(quarterly: Columns, ttm: Columns, months: np.ndarray, cagr_years: int = 3) -> Dict[str, np.ndarray]:
+    """QoQ/YoY growth, TTM growth and CAGR, and TTM margins with their year-over-year change."""
+    year = QUARTERS_PER_YEAR
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = {}
+        for name, field in (
+            ("revenue", "revenue"),
+            ("net_income", "net_income"),
+            ("earnings_per_share", "earnings_per_share"),
+            ("operating_cash_flow", "net_cash_flow_from_operations"),
+        ):
+            metrics[f"{name}_qoq"] = change(quarterly[field], lagged(quarterly[field], months, 1))
+            metrics[f"{name}_yoy"] = change(quarterly[field], lagged(quarterly[field], months, year))
+        for name, field in (("revenue", "revenue"), ("net_income", "net_income")):
+            metrics[f"{name}_ttm_yoy"] = change(ttm[field], lagged(ttm[field], months, year))
+            metrics[f"{name}_cagr_{cagr_years}y"] = cagr(ttm[field], lagged(ttm[field], months, year * cagr_years), cagr_years)
+        for name, field in (
+            ("gross_margin", "gross_profit"),
+            ("operating_margin", "operating_income"),
+            ("net_margin", "net_income"),
+        ):
+            margin = ttm[field] / ttm["revenue"]
+            metrics[f"{name}_ttm"] = margin
+            metrics[f"{name}_change_yoy"] = margin - lagged(margin, months, year)
+        return metrics
@@ -0,0 +1,149 @@
+"""NumPy versions of the ``FinancialMetrics`` ratios, evaluated over whole columns at once.
+
+``columns`` maps statement field names to float arrays (``NaN`` where a
+value is missing), e.g. one entry per ticker or per report period. The
+formulas mirror ``FinancialMetrics`` exactly; divisions by zero yield
+``inf``/``NaN`` instead of raising, and the stock performance ratios are
+``NaN`` where outstanding shares are zero. ``stock_price`` and
+``cost_of_equity`` may be scalars or arrays that broadcast against the
+columns.
+"""
+from typing import Dict, FrozenSet, Iterable, List, Mapping
+
+import numpy as np
+
+from app.schemas.financial_metrics import MetricCategory
+
+Columns = Mapping[str, np.ndarray]
+
+STATEMENT_FIELDS = (
+    "current_assets", "current_liabilities", "inventory", "cash_and_equivalents",
+    "total_assets", "total_liabilities", "shareholders_equity", "trade_and_non_trade_receivables",
+    "trade_and_non_trade_payables", "outstanding_shares",
+    "revenue", "cost_of_revenue", "ebit", "net_income",
+    "depreciation_and_amortization", "dividends_and_other_cash_distributions",
+)
+
+
+def statement_columns(rows: Iterable[Mapping[str, object]], fields: Iterable[str] = STATEMENT_FIELDS) -> Dict[str, np.ndarray]:
+    """Turn merged statement rows (or statement models dumped to dicts) into float columns."""
+    rows = list(rows)
+    return {
+        field: np.array([np.nan if row.get(field) is None else row.get(field) for row in rows], dtype=float)
+        for field in fields
+    }
+
+
+def liquidity_ratios(c: Columns) -> Dict[str, np.ndarray]:
+    return {
+        "current_ratio": c["current_assets"] / c["current_liabilities"],
+        "acid_test_ratio": (c["current_assets"] - c["inventory"]) / c["current_liabilities"],
+        "defensive_interval_ratio": c["cash_and_equivalents"] / c["current_liabilities"],
+    }
+
+
+def ebitda_ratios(c: Columns) -> Dict[str, np.ndarray]:
+    ebitda = c["ebit"] + c["depreciation_and_amortization"]
+    return {
+        "ebitda": ebitda,
+        "ebitda_margin": ebitda / c["revenue"],
+    }
+
+
+def leverage_ratios(c: Columns) -> Dict[str, np.ndarray]:
+    return {
+        "debt_ratio": c["total_liabilities"] / c["total_assets"],
+        "solvency_ratio": (c["total_liabilities"] + c["shareholders_equity"]) / c["total_assets"],
+        "leverage": c["total_assets"] / (c["total_liabilities"] + c["shareholders_equity"]),
+    }
+
+
+def efficiency_ratios(c: Columns) -> Dict[str, np.ndarray]:
+    inventory_turnover = c["cost_of_revenue"] / c["inventory"]
+    receivables_turnover = c["revenue"] / c["trade_and_non_trade_receivables"]
+    payables_turnover = c["cost_of_revenue"] / c["trade_and_non_trade_payables"]
+    return {
+        "inventory_turnover": inventory_turnover,
+        "stock_retention_period": 365 / inventory_turnover,
+        "accounts_receivable_turnover": receivables_turnover,
+        "collection_period": 365 / receivables_turnover,
+        "accounts_payable_turnover": payables_turnover,
+        "payment_period": 365 / payables_turnover,
+        "asset_turnover": c["revenue"] / c["total_assets"],
+    }
+
+
+def profitability_ratios(c: Columns) -> Dict[str, np.ndarray]:
+    return {
+        "sales_margin": c["net_income"] / c["revenue"],
+        "return_on_assets": c["net_income"] / c["total_assets"],
+        "return_on_equity": c["net_income"] / (c["total_assets"] + c["total_liabilities"]),
+    }
+
+
+def dupont_ratios(c: Columns) -> Dict[str, np.ndarray]:
+    return {
+        "sales_margin": c["net_income"] / c["revenue"],
+        "asset_turnover": c["revenue"] / c["total_assets"],
+        "leverage": c["total_assets"] / (c["total_liabilities"] + c["total_assets"]),
+    }
+
+
+def economic_value_ratios(c: Columns, cost_of_equity) -> Dict[str, np.ndarray]:
+    roe = (
+        (c["net_income"] / c["revenue"])
+        * (c["revenue"] / c["total_assets"])
+        * (c["total_assets"] / (c["total_liabilities"] + c["total_assets"]))
+    )
+    economic_margin = roe - cost_of_equity
+    return {
+        "economic_margin": economic_margin,
+        "economic_value_added": economic_margin * (c["total_assets"] + c["total_liabilities"]),
+    }
+
+
+def stock_performance_ratios(c: Columns, stock_price) -> Dict[str, np.ndarray]:
+    shares = np.where(c["outstanding_shares"] == 0, np.nan, c["outstanding_shares"])
+    earnings_per_share = c["net_income"] / shares
+    market_value = stock_price * shares
+    return {
+        "earnings_per_share": earnings_per_share,
+        "dividends_per_share": c["dividends_and_other_cash_distributions"] / shares,
+        "market_value": market_value,
+        "market_value_added": market_value - (c["total_assets"] + c["total_liabilities"]),
+        "price_to_earnings_ratio": stock_price / np.where(earnings_per_share == 0, np.nan, earnings_per_share),
+    }
+
+
+def calculate_metric_arrays(c: Columns, stock_price=0.0, cost_of_equity=0.0) -> Dict[MetricCategory, Dict[str, np.ndarray]]:
+    """Every ``MetricCategory`` evaluated over the given columns in one pass."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            MetricCategory.LIQUIDITY: liquidity_ratios(c),
+            MetricCategory.EBITDA: ebitda_ratios(c),
+            MetricCategory.LEVERAGE: leverage_ratios(c),
+            MetricCategory.EFFICIENCY: efficiency_ratios(c),
+            MetricCategory.PROFITABILITY: profitability_ratios(c),
+            MetricCategory.DUPONT: dupont_ratios(c),
+            MetricCategory.ECONOMIC_VALUE: economic_value_ratios(c, cost_of_equity),
+            MetricCategory.STOCK_PERFORMANCE: stock_performance_ratios(c, stock_price),
+        }
+
+
+def flatten_metric_arrays(groups: Dict[MetricCategory, Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Key metrics as ``"<category>.<metric>"``; names like ``leverage`` repeat across categories."""
+    return {
+        f"{category.value}.{name}": values
+        for category, metrics in groups.items()
+        for name, values in metrics.items()
+    }
+
+
+_EMPTY = {field: np.zeros(0) for field in STATEMENT_FIELDS}
+METRIC_NAMES: List[str] = list(flatten_metric_arrays(calculate_metric_arrays(_EMPTY)))
+
+# Metrics that move with ``stock_price`` or ``cost_of_equity`` rather than with the statements alone
+_ONES = {field: np.ones(1) for field in STATEMENT_FIELDS}
+_LOW, _HIGH = (flatten_metric_arrays(calculate_metric_arrays(_ONES, value, value)) for value in (1.0, 2.0))
+MARKET_INPUT_METRICS: FrozenSet[str] = frozenset(name for name in METRIC_NAMES if not np.array_equal(_LOW[name], _HIGH[name]))
+STATEMENT_METRIC_NAMES: List[str] = [name for name in METRIC_NAMES if name not in MARKET_INPUT_METRICS]
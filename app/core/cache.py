@@ -0,0 +1,249 @@
+"""Bounded caches used by the upstream fetchers and derived views.
+
+``TTLCache`` lives in one process. ``FileCache`` keeps its entries in a
+directory, so every uvicorn worker on a host shares them. Both expose the
+same ``get``/``set``/``get_or_set`` interface and a per-key ``lock()`` for
+single-flight loading. ``make_cache`` picks the backend from
+``CACHE_BACKEND``.
+"""
+import fcntl
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from config import CACHE_BACKEND, CACHE_DIR, CACHE_MAX_BYTES
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, List[Any]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    @contextmanager
+    def lock(self, key: Hashable) -> Iterator[None]:
+        """Serialize loaders of ``key`` across this process's threads."""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        return _get_or_set(self, key, loader, ttl)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FileCache:
+    """Cache stored as one pickle per entry under ``directory``, shared between processes.
+
+    Writes go to a temporary file that is renamed over the entry, so readers
+    never see a partial value. Entries expire after ``ttl`` seconds of wall
+    time. When a process has written enough new entries it trims the
+    directory back under ``max_entries`` and ``max_bytes``, least recently
+    read first. ``lock(key)`` holds an ``fcntl`` lock on one of
+    ``LOCK_STRIPES`` lock files, which makes ``get_or_set`` single-flight
+    across every process and thread on the host. There are enough stripes
+    that unrelated keys rarely wait on each other; the lock files are empty
+    and created on first use. Keys must have a ``repr``
+    that is stable across processes (strings, numbers, tuples of them).
+
+    Loading a pickle can run arbitrary code, so ``directory`` is created
+    with mode 0700 and refused unless it belongs to the current user and is
+    closed to everyone else.
+    """
+
+    LOCK_STRIPES = 65536
+    SUFFIX = ".entry"
+
+    def __init__(self, directory: str, max_entries: int = 1024, ttl: float = 300.0, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        private_directory(directory)
+        self._lock_directory = os.path.join(directory, ".locks")
+        os.makedirs(self._lock_directory, mode=0o700, exist_ok=True)
+        self._writes_since_trim = 0
+        self._trim_every = max(1, max_entries // 16)
+
+    def _name(self, key: Hashable) -> str:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: Hashable) -> str:
+        return os.path.join(self.directory, self._name(key) + self.SUFFIX)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except (EOFError, pickle.UnpicklingError, ValueError):
+            self._remove(path)
+            return default
+        if expires_at < time.time():
+            self._remove(path)
+            return default
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        self._writes_since_trim += 1
+        if self._writes_since_trim >= self._trim_every:
+            self._writes_since_trim = 0
+            self.trim()
+
+    def delete(self, key: Hashable) -> None:
+        self._remove(self._path(key))
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    @contextmanager
+    def lock(self, key: Hashable) -> Iterator[None]:
+        """Hold an exclusive lock shared by every process that loads ``key``."""
+        stripe = int(self._name(key)[:8], 16) % self.LOCK_STRIPES
+        with open(os.path.join(self._lock_directory, f"{stripe:04x}.lock"), "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        return _get_or_set(self, key, loader, ttl)
+
+    def trim(self) -> None:
+        """Evict least recently read entries until the directory is within its bounds."""
+        with open(os.path.join(self._lock_directory, "trim.lock"), "a+b") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process is already trimming
+                return
+            try:
+                entries = []
+                for entry in self._entries():
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                entries.sort()
+                total_bytes = sum(size for _, size, _ in entries)
+                excess = len(entries) - self.max_entries
+                for _, size, path in entries:
+                    if excess <= 0 and total_bytes <= self.max_bytes:
+                        break
+                    self._remove(path)
+                    excess -= 1
+                    total_bytes -= size
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _entries(self) -> List[os.DirEntry]:
+        with os.scandir(self.directory) as it:
+            return [entry for entry in it if entry.name.endswith(self.SUFFIX)]
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+
+def private_directory(path: str) -> None:
+    """Create ``path`` with mode 0700 if needed and check that only the current user can use it."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"Cache directory {path} must be a directory owned by this user with mode 0700")
+
+
+def _get_or_set(cache, key: Hashable, loader: Callable[[], Any], ttl: Optional[float]) -> Any:
+    """Return the cached value, running ``loader`` in at most one caller at a time."""
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    with cache.lock(key):
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            cache.set(key, value, ttl)
+    return value
+
+
+def make_cache(name: str, max_entries: int, ttl: float):
+    """A cache named ``name`` backed by ``CACHE_BACKEND`` ("memory" or "file")."""
+    if CACHE_BACKEND == "file":
+        private_directory(CACHE_DIR)
+        return FileCache(os.path.join(CACHE_DIR, name), max_entries=max_entries, ttl=ttl)
+    return TTLCache(max_entries=max_entries, ttl=ttl)
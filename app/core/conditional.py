@@ -0,0 +1,171 @@
+"""Strong ETags derived from data fingerprints, and ``If-None-Match`` -> 304 handling.
+
+For every GET/HEAD request the middleware opens a ``Fingerprint``. Each
+upstream payload fetched on the request's own thread adds its content
+digest to it. Routes call ``raise_if_not_modified()`` once their inputs are
+known and before doing any expensive work. If the client already holds the
+ETag, the request ends with a 304 and nothing is computed or serialized.
+Responses whose output depends on more than those digests call
+``use_body_etag()``; they, and routes that fetched nothing, get an ETag
+hashed from the response body instead. Fingerprint ETags also cover
+``CODE_VERSION``, so a deploy that changes a formula or a schema
+invalidates them (and the caches keyed by them) even when upstream has not
+changed.
+"""
+import hashlib
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.telemetry import increment
+from config import APP_VERSION
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def source_digest() -> str:
+    """Digest of the application's Python source and models."""
+    root = Path(__file__).resolve().parents[2]
+    hasher = hashlib.blake2b(digest_size=16)
+    for path in sorted([*root.joinpath("app").rglob("*.py"), root / "models.py"]):
+        hasher.update(path.relative_to(root).as_posix().encode() + b"\0" + path.read_bytes())
+    return hasher.hexdigest()
+
+
+CODE_VERSION = APP_VERSION or source_digest()
+
+
+class Fingerprint:
+    def __init__(self, request_key: bytes, if_none_match: Optional[str]):
+        self.request_key = request_key
+        self.if_none_match = parse_if_none_match(if_none_match)
+        self.components: List[str] = []
+        self.is_usable = True
+
+    def etag(self) -> Optional[str]:
+        if not self.is_usable or not self.components:
+            return None
+        hasher = hashlib.blake2b(CODE_VERSION.encode() + b"\0" + self.request_key, digest_size=16)
+        for component in self.components:
+            hasher.update(b"\0" + component.encode())
+        return f'"{hasher.hexdigest()}"'
+
+    def matches(self, etag: Optional[str]) -> bool:
+        return etag is not None and ("*" in self.if_none_match or etag in self.if_none_match)
+
+
+def parse_if_none_match(value: Optional[str]) -> List[str]:
+    """Tags from an ``If-None-Match`` header; weak validators compare equal to strong ones."""
+    if not value:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in value.split(",") if tag.strip()]
+
+
+_fingerprint: ContextVar[Optional[Fingerprint]] = ContextVar("fingerprint", default=None)
+
+
+def add_component(component: str) -> None:
+    """Fold a data digest (or any value the response depends on) into the current fingerprint."""
+    fingerprint = _fingerprint.get()
+    if fingerprint is not None:
+        fingerprint.components.append(component)
+
+
+def current_etag() -> Optional[str]:
+    """ETag of the current request from the data gathered so far, or None when it has none."""
+    fingerprint = _fingerprint.get()
+    return fingerprint.etag() if fingerprint is not None else None
+
+
+def use_body_etag() -> None:
+    """Mark the current response as depending on more than its upstream digests."""
+    fingerprint = _fingerprint.get()
+    if fingerprint is not None:
+        fingerprint.is_usable = False
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def raise_if_not_modified() -> None:
+    """Short-circuit with a 304 when the client's ETag matches the data gathered so far."""
+    fingerprint = _fingerprint.get()
+    if fingerprint is None or not fingerprint.if_none_match:
+        return
+    etag = fingerprint.etag()
+    if fingerprint.matches(etag):
+        raise NotModified(etag)
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    increment("ai_fund_not_modified_total", source="fingerprint")
+    return Response(status_code=304, headers={"ETag": exc.etag})
+
+
+NOT_MODIFIED_DROPPED_HEADERS = ("content-length", "content-type")
+
+class ConditionalRequestMiddleware:
+    """Attach an ETag to every successful GET/HEAD response and answer matches with 304."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        fingerprint = Fingerprint(
+            scope["method"].encode() + b" " + scope["path"].encode() + b"?" + scope.get("query_string", b""),
+            Headers(scope=scope).get("if-none-match"),
+        )
+        token = _fingerprint.set(fingerprint)
+        start: Optional[Message] = None
+        body: List[bytes] = []
+        is_passthrough = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start, is_passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                is_passthrough = message["status"] != 200 or "etag" in headers or "text/event-stream" in headers.get("content-type", "")
+                if is_passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if is_passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            content = b"".join(body)
+            etag = fingerprint.etag() or f'"{content_digest(content)}"'
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            if fingerprint.matches(etag):
+                increment("ai_fund_not_modified_total", source="body")
+                # Keep CORS, Vary and the other response headers; a 304 only drops the content ones (RFC 9110 15.4.5)
+                for name in NOT_MODIFIED_DROPPED_HEADERS:
+                    del headers[name]
+                await send({**start, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start)
+            await send({"type": "http.response.body", "body": content})
+
+        try:
+            await self.app(scope, receive, send_with_etag)
+        finally:
+            _fingerprint.reset(token)
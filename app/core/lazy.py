@@ -0,0 +1,33 @@
+"""Deferred imports for the NumPy-backed services.
+
+Routers refer to those services through ``LazyModule`` stand-ins, so NumPy
+and pandas are imported by the first request that needs them rather than
+at application startup. ``benchmarks/startup.py`` (and
+``tests/test_startup.py``) check that none of them load with the app.
+"""
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Stands in for the module ``name`` and imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+            return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._module if self._module is not None else self._load()
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
@@ -0,0 +1,193 @@
+"""Latency histograms, counters and structured logging for the hot path.
+
+Everything is kept in-process and rendered in the Prometheus text format by
+the ``/internal/telemetry`` route. Recording a span costs a couple of
+``perf_counter`` calls and a bisect under a lock, so it is safe to wrap every
+upstream call and metric computation.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+STAGE_DURATION = "ai_fund_stage_duration_seconds"
+REQUEST_DURATION = "ai_fund_http_request_duration_seconds"
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram; not thread-safe on its own."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    """Holds every histogram and counter keyed by metric name and label set."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, labels: LabelSet = ()) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, labels: LabelSet = ()) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def discard(self, name: str, labels: LabelSet = ()) -> None:
+        with self._lock:
+            self._histograms.get(name, {}).pop(labels, None)
+            self._counters.get(name, {}).pop(labels, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format (v0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    bucket_labels = labels + (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+registry.describe(STAGE_DURATION, "Duration of instrumented hot-path stages.")
+registry.describe(REQUEST_DURATION, "End-to-end HTTP request latency by route.")
+registry.describe("ai_fund_upstream_requests_total", "Upstream financialdatasets.ai requests by endpoint and status.")
+
+
+@contextmanager
+def span(stage: str, **labels: str) -> Iterator[None]:
+    """Time the enclosed block and record it under ``STAGE_DURATION``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(
+            STAGE_DURATION,
+            time.perf_counter() - start,
+            (("stage", stage),) + tuple(sorted(labels.items())),
+        )
+
+
+def increment(name: str, amount: float = 1, **labels: str) -> None:
+    registry.increment(name, amount, tuple(sorted(labels.items())))
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    registry.observe(name, value, tuple(sorted(labels.items())))
+
+
+def measure_span_overhead(iterations: int = 10_000) -> float:
+    """Return the mean cost of one empty ``span`` in seconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with span("telemetry_overhead"):
+            pass
+    elapsed = time.perf_counter() - start
+    registry.discard(STAGE_DURATION, (("stage", "telemetry_overhead"),))
+    return elapsed / iterations
+
+
+# Structured logging
+
+_RESERVED_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields are emitted as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = "INFO") -> None:
+    """Install the JSON formatter on the ``app`` logger hierarchy."""
+    logger = logging.getLogger("app")
+    logger.setLevel(level.upper())
+    if any(isinstance(handler.formatter, JsonFormatter) for handler in logger.handlers):
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.propagate = False
@@ -0,0 +1,194 @@
+"""Instrumented access to the financialdatasets.ai API shared by all routers.
+
+GET responses are kept with their validators and a content digest. Repeat
+requests are revalidated with ``If-None-Match`` / ``If-Modified-Since``.
+When upstream answers 304, or returns a body whose digest is unchanged, the
+previously decoded JSON and validated models are reused instead of being
+parsed again. Every digest is also added to the request's ETag fingerprint.
+
+Each URL is fetched by one caller at a time, and callers that waited behind
+it reuse its result. Requests time out after ``UPSTREAM_TIMEOUT`` seconds,
+so a stalled upstream cannot hold the URL's lock indefinitely. With ``CACHE_BACKEND=file`` this holds across every
+worker process on the host. Entries younger than ``UPSTREAM_FRESH_TTL`` are
+served without contacting upstream. Bulk callers that read each URL once
+pass ``cache=False`` to skip all of this and keep nothing in memory or on disk.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Optional, Type, TypeVar
+
+import requests
+from fastapi import HTTPException
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+
+from app.core.cache import TTLCache, make_cache
+from app.core.conditional import add_component, content_digest
+from app.core.telemetry import increment, span
+from config import (
+    HEADERS,
+    UPSTREAM_CACHE_MAX_ENTRIES,
+    UPSTREAM_CACHE_TTL,
+    UPSTREAM_FRESH_TTL,
+    UPSTREAM_MAX_CONCURRENCY,
+    UPSTREAM_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Keep-alive connections shared by every thread; sync routes run on AnyIO's
+# 40-thread pool and the fan-out executor below adds its own workers
+POOL_SIZE = 40 + UPSTREAM_MAX_CONCURRENCY
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE))
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE))
+
+# Shared pool for routes that split one request into several upstream calls
+executor = ThreadPoolExecutor(max_workers=UPSTREAM_MAX_CONCURRENCY, thread_name_prefix="upstream")
+
+
+@dataclass
+class UpstreamPayload:
+    data: Any
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+responses = make_cache("upstream", max_entries=UPSTREAM_CACHE_MAX_ENTRIES, ttl=UPSTREAM_CACHE_TTL)
+# Validated instances stay in process; their identity marks unchanged data for derived caches
+validated_models = TTLCache(max_entries=UPSTREAM_CACHE_MAX_ENTRIES, ttl=UPSTREAM_CACHE_TTL)
+
+
+def fetch(
+    endpoint: str, url: str, error_detail: str, payload: dict | None = None, cache: bool = True
+) -> UpstreamPayload:
+    """GET ``url`` (or POST ``payload`` to it) and return the decoded body with its digest.
+
+    ``endpoint`` is a short, low-cardinality name used to label telemetry.
+    Non-200 responses are surfaced as ``HTTPException`` with the upstream
+    status code and ``error_detail``. With ``cache=False`` the GET neither
+    reads nor stores the shared response cache.
+    """
+    if payload is not None or not cache:
+        return _request(endpoint, url, error_detail, payload, None, cache)
+
+    requested_at = time.time()
+    cached = responses.get(url)
+    if not _is_current(cached, requested_at):
+        with responses.lock(url):
+            cached = responses.get(url)
+            if not _is_current(cached, requested_at):
+                return _request(endpoint, url, error_detail, None, cached)
+    increment("ai_fund_upstream_cache_hits_total", endpoint=endpoint)
+    add_component(cached.digest)
+    return cached
+
+
+def _is_current(cached: Optional[UpstreamPayload], requested_at: float) -> bool:
+    """Fresh by ``UPSTREAM_FRESH_TTL``, or fetched by another caller after this one asked."""
+    return cached is not None and cached.fetched_at > requested_at - UPSTREAM_FRESH_TTL
+
+
+def _request(
+    endpoint: str,
+    url: str,
+    error_detail: str,
+    payload: dict | None,
+    cached: Optional[UpstreamPayload],
+    cache: bool = True,
+) -> UpstreamPayload:
+    headers = dict(HEADERS)
+    if cached is not None and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached is not None and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    logger.debug("upstream request", extra={"endpoint": endpoint, "url": url, "revalidating": cached is not None})
+    try:
+        with span("upstream_fetch", endpoint=endpoint):
+            if payload is None:
+                response = session.get(url, headers=headers, timeout=UPSTREAM_TIMEOUT)
+            else:
+                response = session.post(
+                    url,
+                    json=payload,
+                    headers={**headers, "Content-Type": "application/json"},
+                    timeout=UPSTREAM_TIMEOUT,
+                )
+    except requests.exceptions.RequestException as e:
+        increment("ai_fund_upstream_requests_total", endpoint=endpoint, status="error")
+        logger.warning("upstream request failed", extra={"endpoint": endpoint, "error": str(e)})
+        raise HTTPException(status_code=500, detail=f"Request failed: {str(e)}")
+
+    increment("ai_fund_upstream_requests_total", endpoint=endpoint, status=str(response.status_code))
+    if response.status_code == 304 and cached is not None:
+        add_component(cached.digest)
+        return _refresh(url, cached)
+    if response.status_code != 200:
+        logger.warning(
+            "upstream error response",
+            extra={"endpoint": endpoint, "status": response.status_code, "body": response.text[:500]},
+        )
+        raise HTTPException(status_code=response.status_code, detail=error_detail)
+
+    digest = content_digest(response.content)
+    add_component(digest)
+    if cached is not None and cached.digest == digest:
+        increment("ai_fund_upstream_unchanged_total", endpoint=endpoint)
+        return _refresh(url, cached)
+
+    with span("json_decode", endpoint=endpoint):
+        data = response.json()
+    fetched = UpstreamPayload(
+        data=data,
+        digest=digest,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        fetched_at=time.time(),
+    )
+    if payload is None and cache:
+        responses.set(url, fetched)
+    return fetched
+
+
+def _refresh(url: str, cached: UpstreamPayload) -> UpstreamPayload:
+    """Record that upstream confirmed ``cached`` is still current."""
+    refreshed = replace(cached, fetched_at=time.time())
+    responses.set(url, refreshed)
+    return refreshed
+
+
+def fetch_json(endpoint: str, url: str, error_detail: str, payload: dict | None = None, cache: bool = True) -> Any:
+    """Decoded JSON body of an upstream call; see ``fetch``."""
+    return fetch(endpoint, url, error_detail, payload, cache).data
+
+
+def fetch_model(
+    model: Type[ModelT], endpoint: str, url: str, error_detail: str, payload: dict | None = None, cache: bool = True
+) -> ModelT:
+    """Fetch and validate into ``model``; unchanged payloads return the same validated instance."""
+    fetched = fetch(endpoint, url, error_detail, payload, cache)
+    if not cache:
+        return validate(model, fetched.data, endpoint)
+    key = (model, fetched.digest)
+    validated_data = validated_models.get(key)
+    if validated_data is None:
+        validated_data = validate(model, fetched.data, endpoint)
+        validated_models.set(key, validated_data)
+    return validated_data
+
+
+def validate(model: Type[ModelT], data: Any, endpoint: str) -> ModelT:
+    """Validate upstream JSON into ``model``, reporting failures as a 500."""
+    try:
+        with span("validation", endpoint=endpoint):
+            return model(**data)
+    except Exception as e:
+        logger.error("upstream validation failed", extra={"endpoint": endpoint, "error": str(e)})
+        raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
@@ -1,6 +1,7 @@
-import requests
-from fastapi import APIRouter, HTTPException
-from config import BASE_URL, HEADERS  # Import from config
+from fastapi import APIRouter
+from config import BASE_URL  # Import from config
+from app.core.conditional import raise_if_not_modified
+from app.core.upstream import fetch_json
 
 router = APIRouter()
 
@@ -8,9 +9,6 @@ router = APIRouter()
 @router.get("/company/facts/{ticker}")
 def get_company_facts(ticker: str):
     url = f"{BASE_URL}/company/facts?ticker={ticker}"
-    response = requests.get(url, headers=HEADERS)
-
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching company facts")
+    data = fetch_json("company_facts", url, "Error fetching company facts")
+    raise_if_not_modified()
+    return data
@@ -1,11 +1,22 @@
-import requests
+import json
 from enum import Enum
 from fastapi import APIRouter, HTTPException
-from config import BASE_URL, HEADERS
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from config import BASE_URL, SCREEN_HISTORY_LIMIT
+from app.core.telemetry import span
+from app.core.conditional import raise_if_not_modified
+from app.core.lazy import LazyModule
+from app.core.upstream import executor, fetch_json, fetch_model, validate
+from app.services import line_items, screener
+from app.services.statement_store import statement_store
+from app.schemas.segments import SegmentPivotResponse
 from models import FinancialSearchPayload, LineItemsPayload, IncomeStatementsResponse, BalanceSheetsResponse, CashFlowStatementsResponse, SegmentedFinancialsResponse, AllFinancialsResponse, FinancialSearchResponse, LineItemSearchResponse
 
 router = APIRouter()
 
+segment_pivot = LazyModule("app.services.segment_pivot")
+
 class FinancialPeriod(str, Enum):
     ANNUAL = "annual"
     QUARTERLY = "quarterly" 
@@ -27,36 +38,11 @@ def get_income_statements(
         url += f"&limit={limit}"
     if cik:
         url += f"&cik={cik}"
-    
-    print(f"[{ticker}] Requesting income statements: {url}")
-    try:
-        response = requests.get(url, headers=HEADERS)
-        print(f"[{ticker}] Income statements response status: {response.status_code}")
-        
-        if response.status_code == 200:
-            try:
-                data = response.json()
-                print(f"[{ticker}] Successfully parsed JSON response")
-                validated_data = IncomeStatementsResponse(**data)
-                return validated_data
-            except Exception as e:
-                print(f"[{ticker}] Error validating income statements data: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
-        else:
-            error_message = f"Error fetching income statements for {ticker}"
-            try:
-                error_detail = response.json()
-                print(f"[{ticker}] Error response: {error_detail}")
-                error_message += f": {error_detail}"
-            except:
-                error_message += f": Status {response.status_code}"
-            
-            print(f"[{ticker}] {error_message}")
-            raise HTTPException(status_code=response.status_code, detail=error_message)
-            
-    except requests.exceptions.RequestException as e:
-        print(f"[{ticker}] Request failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Request failed: {str(e)}")
+
+    validated_data = fetch_model(IncomeStatementsResponse, "income_statements", url, f"Error fetching income statements for {ticker}")
+    statement_store.record(validated_data.income_statements, limit=limit)
+    raise_if_not_modified()
+    return validated_data
 
 # 2. Balance Sheets
 @router.get("/financials/balance-sheets/{ticker}", response_model=BalanceSheetsResponse)
@@ -74,17 +60,11 @@ def get_balance_sheets(
         url += f"&limit={limit}"
     if cik:
         url += f"&cik={cik}"
-    response = requests.get(url, headers=HEADERS)
 
-    if response.status_code == 200:
-        try:
-            data = response.json()            
-            validated_data = BalanceSheetsResponse(**data)
-            return validated_data
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching balance sheets")
+    validated_data = fetch_model(BalanceSheetsResponse, "balance_sheets", url, "Error fetching balance sheets")
+    statement_store.record(validated_data.balance_sheets, limit=limit)
+    raise_if_not_modified()
+    return validated_data
 
 # 3. Cash Flow Statements
 @router.get("/financials/cash-flow-statements/{ticker}", response_model=CashFlowStatementsResponse)
@@ -102,79 +82,102 @@ def get_cash_flow_statements(
         url += f"&limit={limit}"
     if cik:
         url += f"&cik={cik}"
-    response = requests.get(url, headers=HEADERS)
 
-    if response.status_code == 200:
-        try:
-            data = response.json()            
-            validated_data = CashFlowStatementsResponse(**data)
-            return validated_data
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching cash flow statements")
+    validated_data = fetch_model(CashFlowStatementsResponse, "cash_flow_statements", url, "Error fetching cash flow statements")
+    statement_store.record(validated_data.cash_flow_statements, limit=limit)
+    raise_if_not_modified()
+    return validated_data
 
 # 4. Segmented Financials
 @router.get("/financials/segmented/{ticker}", response_model=SegmentedFinancialsResponse)
 def get_segmented_financials(ticker: str, period: str = "annual", limit: int = 5):
     url = f"{BASE_URL}/financials/segmented?ticker={ticker}&period={period}&limit={limit}"
-    response = requests.get(url, headers=HEADERS)
+    validated_data = fetch_model(SegmentedFinancialsResponse, "segmented_financials", url, "Error fetching segmented financials")
+    raise_if_not_modified()
+    return validated_data
 
-    if response.status_code == 200:
-        try:
-            data = response.json()
-            # Validate the response with the SegmentedFinancialsResponse model
-            validated_data = SegmentedFinancialsResponse(**data)
-            return validated_data
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
+# 4b. Segmented Financials pivoted by axis and key
+@router.get("/financials/segmented/{ticker}/pivot", response_model=SegmentPivotResponse)
+def get_segmented_pivot(ticker: str, period: str = "annual", limit: int = 5, axis: str | None = None):
+    """Sums, shares of total and period-over-period growth per segment, cached per ticker"""
+    segmented = get_segmented_financials(ticker=ticker, period=period, limit=limit)
+    cache_key = (ticker, period, limit)
+    cached = segment_pivot.pivot_cache.get(cache_key)
+    # Unchanged upstream payloads come back as the same validated instance
+    if cached is not None and cached[0] is segmented:
+        pivoted = cached[1]
     else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching segmented financials")
+        with span("segment_pivot"):
+            pivoted = segment_pivot.pivot(ticker, period, segmented.segmented_financials)
+        segment_pivot.pivot_cache.set(cache_key, (segmented, pivoted))
+
+    if axis is None:
+        return pivoted
+    return pivoted.model_copy(update={"axes": [axis_pivot for axis_pivot in pivoted.axes if axis_pivot.axis == axis]})
     
 # 5. All Financials for a Ticker
 @router.get("/financials/{ticker}", response_model=AllFinancialsResponse)
 def get_all_financials(ticker: str, period: str = "annual", limit: int = 5):
     url = f"{BASE_URL}/financials?ticker={ticker}&period={period}&limit={limit}"
-    response = requests.get(url, headers=HEADERS)
-
-    if response.status_code == 200:
-        try:
-            data = response.json()            
-            validated_data = AllFinancialsResponse(**data)
-            return validated_data
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching financials")
+    validated_data = fetch_model(AllFinancialsResponse, "all_financials", url, "Error fetching financials")
+    financials = validated_data.financials
+    statement_store.record(
+        [*financials.income_statements, *financials.balance_sheets, *financials.cash_flow_statements], limit=limit
+    )
+    raise_if_not_modified()
+    return validated_data
 
 # 6. Search Financials (POST)
 @router.post("/financials/search", response_model=FinancialSearchResponse)
 def search_financials(payload: FinancialSearchPayload):
-    url = f"{BASE_URL}/financials/search"
-    response = requests.post(url, json=payload.dict(), headers={**HEADERS, "Content-Type": "application/json"})
-    
-    if response.status_code == 200:
+    """Screens naming their tickers run locally, fetching tickers not held; open screens go upstream"""
+    if not screener.can_screen_locally(payload):
+        url = f"{BASE_URL}/financials/search"
+        data = fetch_json("financial_search", url, "Error performing financial search", payload=payload.dict(exclude={"tickers"}))
+        return validate(FinancialSearchResponse, data, "financial_search")
+
+    missing = screener.missing_tickers(payload)
+    if missing:
+        load_statements(missing, FinancialPeriod(payload.period), screener.required_kinds(payload))
+    return screener.screen(payload)
+
+STATEMENT_FETCHERS = {
+    "income_statements": get_income_statements,
+    "balance_sheets": get_balance_sheets,
+    "cash_flow_statements": get_cash_flow_statements,
+}
+
+def load_statements(
+    tickers: list[str],
+    period: FinancialPeriod,
+    kinds: set[str],
+    limit: int = SCREEN_HISTORY_LIMIT,
+    ignore_errors: bool = False
+) -> None:
+    """Fetch the given statement kinds for ``tickers`` concurrently into the statement store"""
+    futures = [
+        executor.submit(STATEMENT_FETCHERS[kind], ticker=ticker, period=period, limit=limit)
+        for ticker in tickers
+        for kind in kinds
+    ]
+    for future in futures:
         try:
-            data = response.json()            
-            validated_data = FinancialSearchResponse(**data)
-            return validated_data
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error performing financial search")
+            future.result()
+        except HTTPException:
+            if not ignore_errors:
+                raise
+
+def to_ndjson(rows):
+    for row in rows:
+        yield (row.model_dump_json() if isinstance(row, BaseModel) else json.dumps(row)) + "\n"
 
 # 7. Search Line Items (POST)
 @router.post("/financials/search/line-items", response_model=LineItemSearchResponse)
-def search_line_items(payload: LineItemsPayload):
-    url = f"{BASE_URL}/financials/search/line-items"
-    response = requests.post(url, json=payload.dict(), headers={**HEADERS, "Content-Type": "application/json"})
-    
-    if response.status_code == 200:
-        try:
-            data = response.json()            
-            validated_data = LineItemSearchResponse(**data)
-            return validated_data
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error performing line items search")
+def search_line_items(payload: LineItemsPayload, stream: bool = False):
+    """Fan out large ticker lists in cached chunks; ``stream=true`` returns NDJSON rows as chunks complete"""
+    if stream:
+        return StreamingResponse(
+            to_ndjson(line_items.stream_line_items(payload)),
+            media_type="application/x-ndjson",
+        )
+    return line_items.search_line_items(payload)
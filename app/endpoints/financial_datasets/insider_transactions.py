@@ -1,6 +1,13 @@
-import requests
-from fastapi import APIRouter, HTTPException
-from config import BASE_URL, HEADERS  # Import from config
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+from fastapi import APIRouter, HTTPException, Query
+from config import BASE_URL, INSIDER_BACKFILL_LIMIT, INSIDER_SYNC_INTERVAL, INSIDER_SYNC_LIMIT, INSIDER_WINDOWS  # Import from config
+from app.core.conditional import raise_if_not_modified, use_body_etag
+from app.core.telemetry import increment
+from app.core.upstream import fetch_json, validate
+from app.schemas.insider_transactions import InsiderAggregatesResponse, NetInsiderBuyingResponse
+from app.services.insider_store import TransactionKey, insider_store, transaction_key
+from models import InsiderTransactionModel, InsiderTransactionsResponse
 
 router = APIRouter()
 
@@ -8,9 +15,79 @@ router = APIRouter()
 @router.get("/insider-transactions/{ticker}")
 def get_insider_transactions(ticker: str, limit: int = 5):
     url = f"{BASE_URL}/insider-transactions?ticker={ticker}&limit={limit}"
-    response = requests.get(url, headers=HEADERS)
+    data = fetch_json("insider_transactions", url, "Error fetching insider transactions")
+    raise_if_not_modified()
+    return data
 
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching insider transactions")
+def sync_insider_transactions(ticker: str, force: bool = False) -> int:
+    """Pull only filings newer than the last one seen (a full backfill the first time)"""
+    last_synced = insider_store.last_synced(ticker)
+    if not force and last_synced and (datetime.now(timezone.utc) - last_synced).total_seconds() < INSIDER_SYNC_INTERVAL:
+        return 0
+
+    cursor = insider_store.cursor(ticker)
+    if cursor is None:
+        transactions = fetch_sync_page(f"{BASE_URL}/insider-transactions?ticker={ticker}&limit={INSIDER_BACKFILL_LIMIT}")
+        return insider_store.record(ticker, transactions, synced=True)
+    transactions, overflowed_on = fetch_filed_since(ticker, cursor)
+    return insider_store.record(ticker, transactions, synced=True, cursor_limit=overflowed_on)
+
+def fetch_filed_since(ticker: str, cursor: date) -> Tuple[List[InsiderTransactionModel], Optional[date]]:
+    """Page back from the newest filing to the cursor, until a short page.
+
+    Pages are collected before anything is recorded, so the cursor only
+    advances once every filing since it has been fetched. Upstream pages by
+    filing date alone, so when more than a page of filings share one date
+    the rest of that date cannot be reached: paging carries on below it and
+    the date is returned, so the cursor is held there and later syncs retry it.
+    """
+    transactions: List[InsiderTransactionModel] = []
+    keys: Set[TransactionKey] = set()
+    overflowed_on: Optional[date] = None
+    url = f"{BASE_URL}/insider-transactions?ticker={ticker}&limit={INSIDER_SYNC_LIMIT}&filing_date_gte={cursor.isoformat()}"
+    page_url = url
+    while True:
+        page = fetch_sync_page(page_url)
+        fetched = [transaction for transaction in page if transaction_key(transaction) not in keys]
+        keys.update(transaction_key(transaction) for transaction in fetched)
+        transactions.extend(transaction for transaction in fetched if not insider_store.has_seen(ticker, transaction))
+        if len(page) < INSIDER_SYNC_LIMIT:
+            return transactions, overflowed_on
+        oldest = min(transaction.filing_date for transaction in page)
+        if fetched:
+            # Inclusive, so filings sharing the page's oldest date are not skipped; repeats are dropped above
+            page_url = f"{url}&filing_date_lte={oldest.isoformat()}"
+            continue
+        # A full page of repeats: every row was filed on ``oldest``
+        overflowed_on = oldest if overflowed_on is None else min(overflowed_on, oldest)
+        increment("ai_fund_insider_sync_overflows_total")
+        if oldest <= cursor:
+            return transactions, overflowed_on
+        page_url = f"{url}&filing_date_lte={(oldest - timedelta(days=1)).isoformat()}"
+
+def fetch_sync_page(url: str) -> List[InsiderTransactionModel]:
+    data = fetch_json("insider_transactions_sync", url, "Error syncing insider transactions")
+    return validate(InsiderTransactionsResponse, data, "insider_transactions_sync").insider_transactions
+
+# Rolling insider aggregates (synced incrementally)
+@router.get("/insider-transactions/{ticker}/aggregates", response_model=InsiderAggregatesResponse)
+def get_insider_aggregates(ticker: str, refresh: bool = False):
+    # Windows move with the calendar, so the sync payload alone does not identify the response
+    use_body_etag()
+    sync_insider_transactions(ticker, force=refresh)
+    return InsiderAggregatesResponse(
+        ticker=ticker,
+        as_of=date.today(),
+        last_synced=insider_store.last_synced(ticker),
+        transactions_held=insider_store.transactions_held(ticker),
+        windows=insider_store.aggregates(ticker),
+    )
+
+# Largest net insider buying across every synced ticker
+@router.get("/insider-transactions/net-buying/top", response_model=NetInsiderBuyingResponse)
+def get_top_net_insider_buying(window: int = 90, k: int = Query(10, ge=1, le=500)):
+    if window not in INSIDER_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {list(INSIDER_WINDOWS)}")
+
+    results = insider_store.top_net_buying(window, k)
+    return NetInsiderBuyingResponse(window_days=window, as_of=date.today(), results=results)
@@ -1,6 +1,7 @@
-import requests
-from fastapi import APIRouter, HTTPException
-from config import BASE_URL, HEADERS  # Import from config
+from fastapi import APIRouter
+from config import BASE_URL  # Import from config
+from app.core.conditional import raise_if_not_modified
+from app.core.upstream import fetch_json
 
 router = APIRouter()
 
@@ -8,21 +9,15 @@ router = APIRouter()
 @router.get("/prices/{ticker}")
 def get_prices(ticker: str, period: str = "daily", limit: int = 5):
     url = f"{BASE_URL}/prices?ticker={ticker}&period={period}&limit={limit}"
-    response = requests.get(url, headers=HEADERS)
-
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching prices")
+    data = fetch_json("prices", url, "Error fetching prices")
+    raise_if_not_modified()
+    return data
 
 
 # 2. Get Price Snapshot
 @router.get("/prices/snapshot/{ticker}")
 def get_price_snapshot(ticker: str):
     url = f"{BASE_URL}/prices/snapshot?ticker={ticker}"
-    response = requests.get(url, headers=HEADERS)
-
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching price snapshot")
+    data = fetch_json("price_snapshot", url, "Error fetching price snapshot")
+    raise_if_not_modified()
+    return data
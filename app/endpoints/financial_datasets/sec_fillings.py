@@ -1,6 +1,7 @@
-import requests
-from fastapi import APIRouter, HTTPException
-from config import BASE_URL, HEADERS  # Import from config
+from fastapi import APIRouter
+from config import BASE_URL  # Import from config
+from app.core.conditional import raise_if_not_modified
+from app.core.upstream import fetch_json
 
 router = APIRouter()
 
@@ -8,9 +9,6 @@ router = APIRouter()
 @router.get("/filings/{ticker}")
 def get_filings(ticker: str, limit: int = 5):
     url = f"{BASE_URL}/filings?ticker={ticker}&limit={limit}"
-    response = requests.get(url, headers=HEADERS)
-
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching filings")
+    data = fetch_json("filings", url, "Error fetching filings")
+    raise_if_not_modified()
+    return data
@@ -1,18 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
 from typing import Dict, Optional, List
 from app.agents.financial_metrics import FinancialMetrics
-from app.schemas.financial_metrics import GroupedMetrics, MetricGroup, MetricCategory
+from app.core.cache import make_cache
+from app.core.conditional import NotModified, current_etag, raise_if_not_modified, use_body_etag
+from app.core.lazy import LazyModule
+from app.core.telemetry import span
+from app.schemas.financial_metrics import GroupedMetrics, MetricGroup, MetricCategory, MetricsRollup
+from app.schemas.sensitivity import SensitivityPayload, SensitivityResponse
+from app.schemas.peer_ranking import MetricRanking, PeerRankingResponse, RankedValue
+from config import METRICS_CACHE_MAX_ENTRIES, METRICS_CACHE_TTL, PEER_GROUPS
 from models import BalanceSheetsResponse, IncomeStatementsResponse, CashFlowStatementsResponse
 from app.endpoints.financial_datasets.financials import (
     get_income_statements,
     get_balance_sheets,
     get_cash_flow_statements,
+    get_all_financials,
+    load_statements,
     FinancialPeriod
 )
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-async def get_grouped_metrics(
+peer_ranking = LazyModule("app.services.peer_ranking")
+rollups = LazyModule("app.services.rollups")
+sensitivity = LazyModule("app.services.sensitivity")
+
+grouped_metrics_adapter = TypeAdapter(List[GroupedMetrics])
+
+# Serialized grouped metrics keyed by the request's ETag, shared by all workers with CACHE_BACKEND=file
+metric_results = make_cache("metrics", max_entries=METRICS_CACHE_MAX_ENTRIES, ttl=METRICS_CACHE_TTL)
+
+def get_grouped_metrics(
     balance_sheets: BalanceSheetsResponse,
     income_statements: IncomeStatementsResponse, 
     cash_flow_statements: CashFlowStatementsResponse,
@@ -30,23 +51,31 @@ async def get_grouped_metrics(
     ):
         try:
             # Calculate all metrics
-            liquidity_metrics = metrics.calculate_liquidity_ratios(balance_sheet)
-            ebitda_metrics = metrics.calculate_ebitda_ratios(income_statement, cash_flow_statement)
-            leverage_metrics = metrics.calculate_leverage_ratios(balance_sheet)
-            efficiency_metrics = metrics.calculate_efficiency_ratios(income_statement, balance_sheet)
-            profitability_metrics = metrics.calculate_profitability_ratios(income_statement, balance_sheet)
-            dupont_metrics = metrics.calculate_dupont_ratios(income_statement, balance_sheet)
-            economic_value_metrics = metrics.calculate_economic_value_ratios(
-                income_statement, 
-                balance_sheet, 
-                cost_of_equity
-            )
-            stock_performance_metrics = metrics.calculate_stock_performance_ratios(
-                income_statement, 
-                balance_sheet, 
-                cash_flow_statement, 
-                stock_price
-            )
+            with span("metric_computation", category=MetricCategory.LIQUIDITY.value):
+                liquidity_metrics = metrics.calculate_liquidity_ratios(balance_sheet)
+            with span("metric_computation", category=MetricCategory.EBITDA.value):
+                ebitda_metrics = metrics.calculate_ebitda_ratios(income_statement, cash_flow_statement)
+            with span("metric_computation", category=MetricCategory.LEVERAGE.value):
+                leverage_metrics = metrics.calculate_leverage_ratios(balance_sheet)
+            with span("metric_computation", category=MetricCategory.EFFICIENCY.value):
+                efficiency_metrics = metrics.calculate_efficiency_ratios(income_statement, balance_sheet)
+            with span("metric_computation", category=MetricCategory.PROFITABILITY.value):
+                profitability_metrics = metrics.calculate_profitability_ratios(income_statement, balance_sheet)
+            with span("metric_computation", category=MetricCategory.DUPONT.value):
+                dupont_metrics = metrics.calculate_dupont_ratios(income_statement, balance_sheet)
+            with span("metric_computation", category=MetricCategory.ECONOMIC_VALUE.value):
+                economic_value_metrics = metrics.calculate_economic_value_ratios(
+                    income_statement, 
+                    balance_sheet, 
+                    cost_of_equity
+                )
+            with span("metric_computation", category=MetricCategory.STOCK_PERFORMANCE.value):
+                stock_performance_metrics = metrics.calculate_stock_performance_ratios(
+                    income_statement, 
+                    balance_sheet, 
+                    cash_flow_statement, 
+                    stock_price
+                )
 
             # Create MetricGroup objects for each category
             metric_groups = [
@@ -75,7 +104,7 @@ async def get_grouped_metrics(
     return grouped_metrics
 
 @router.get("/grouped/{ticker}", response_model=List[GroupedMetrics])
-async def get_ticker_metrics(
+def get_ticker_metrics(
     ticker: str,
     period: FinancialPeriod = FinancialPeriod.ANNUAL,
     limit: int = 1,
@@ -86,22 +115,11 @@ async def get_ticker_metrics(
 ):
     try:
         # Get financial statements with logging
-        print(f"Fetching financial data for {ticker}")
+        logger.debug("fetching financial data", extra={"ticker": ticker, "period": period.value, "limit": limit})
         
         income_statements = get_income_statements(ticker=ticker, period=period, limit=limit, cik=cik)
-        print(f"Income statements retrieved: {bool(income_statements)}")
-        if income_statements:
-            print(f"Number of income statements: {len(income_statements.income_statements)}")
-        
         balance_sheets = get_balance_sheets(ticker=ticker, period=period, limit=limit, cik=cik)
-        print(f"Balance sheets retrieved: {bool(balance_sheets)}")
-        if balance_sheets:
-            print(f"Number of balance sheets: {len(balance_sheets.balance_sheets)}")
-        
         cash_flows = get_cash_flow_statements(ticker=ticker, period=period, limit=limit, cik=cik)
-        print(f"Cash flows retrieved: {bool(cash_flows)}")
-        if cash_flows:
-            print(f"Number of cash flows: {len(cash_flows.cash_flow_statements)}")
 
         # Validate we have data with more specific error messages
         if not income_statements:
@@ -137,11 +155,28 @@ async def get_ticker_metrics(
                 detail=f"Cash flow statements list is empty for {ticker}"
             )
 
-        print(f"All financial data retrieved successfully for {ticker}")
+        logger.debug(
+            "financial data retrieved",
+            extra={
+                "ticker": ticker,
+                "income_statements": len(income_statements.income_statements),
+                "balance_sheets": len(balance_sheets.balance_sheets),
+                "cash_flow_statements": len(cash_flows.cash_flow_statements),
+            },
+        )
+
+        # The statements' digests identify the response; skip computing it if the client has it
+        raise_if_not_modified()
+
+        # Same statements and query parameters, same body
+        cache_key = current_etag()
+        body = metric_results.get(cache_key) if cache_key else None
+        if body is not None:
+            return Response(content=body, media_type="application/json")
 
         try:
             # Calculate grouped metrics for each period
-            result = await get_grouped_metrics(
+            result = get_grouped_metrics(
                 balance_sheets=balance_sheets,
                 income_statements=income_statements,
                 cash_flow_statements=cash_flows,
@@ -149,21 +184,105 @@ async def get_ticker_metrics(
                 cost_of_equity=cost_of_equity,
                 metrics=metrics
             )
-            print(f"Metrics calculated successfully for {ticker}")
-            return result
+            logger.debug("metrics calculated", extra={"ticker": ticker, "periods": len(result)})
         except Exception as calc_error:
-            print(f"Error calculating metrics for {ticker}: {str(calc_error)}")
+            logger.error("error calculating metrics", extra={"ticker": ticker, "error": str(calc_error)})
             raise HTTPException(
                 status_code=500,
                 detail=f"Error calculating metrics for {ticker}: {str(calc_error)}"
             )
 
-    except HTTPException as http_error:
-        # Re-raise HTTP exceptions
+        with span("serialization", route="metrics_grouped"):
+            body = grouped_metrics_adapter.dump_json(result)
+        if cache_key:
+            metric_results.set(cache_key, body)
+        return Response(content=body, media_type="application/json")
+
+    except (HTTPException, NotModified) as http_error:
+        # Re-raise HTTP exceptions and 304 short-circuits
         raise http_error
     except Exception as e:
-        print(f"Unexpected error processing {ticker}: {str(e)}")
+        logger.exception("unexpected error processing ticker", extra={"ticker": ticker})
         raise HTTPException(
             status_code=500,
             detail=f"Unexpected error processing {ticker}: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/rank", response_model=PeerRankingResponse)
+def get_peer_ranking(
+    metric: List[str] = Query(..., description="Metric as <category>.<name>, or a bare name unique across categories"),
+    tickers: List[str] | None = Query(None),
+    peer_group: str | None = None,
+    focus: List[str] | None = Query(None, description="Tickers to report percentiles for; defaults to the whole universe"),
+    k: int = Query(5, ge=1, le=100)
+):
+    """Rank a universe (explicit tickers or a named peer group) on any statement-derived FinancialMetrics metric"""
+    # Tickers already in the statement store are not fetched, so upstream digests do not cover the response
+    use_body_etag()
+    if (tickers is None) == (peer_group is None):
+        raise HTTPException(status_code=400, detail="Provide either tickers or peer_group")
+    if peer_group is not None and peer_group not in PEER_GROUPS:
+        raise HTTPException(status_code=404, detail=f"Unknown peer group: {peer_group}")
+
+    peer_ranker = peer_ranking.peer_ranker
+    resolved = {name: peer_ranker.resolve_metric(name) for name in metric}
+    unknown = [name for name, metric_name in resolved.items() if metric_name is None]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown, ambiguous or price-dependent metrics: {', '.join(unknown)}",
+        )
+
+    members = list(dict.fromkeys(PEER_GROUPS[peer_group] if peer_group is not None else tickers))
+    missing = peer_ranker.missing_tickers(members)
+    if missing:
+        load_statements(
+            missing, FinancialPeriod(peer_ranking.RANK_PERIOD), set(peer_ranking.REQUIRED_KINDS), limit=1, ignore_errors=True
+        )
+
+    with span("peer_ranking", universe="peer_group" if peer_group is not None else "tickers"):
+        # Statement refreshes update the index in place; hold the ranker lock while reading it
+        with peer_ranker.lock:
+            index = peer_ranker.index_for(peer_group if peer_group is not None else frozenset(members), members)
+            rankings = [
+                MetricRanking(
+                    metric=metric_name,
+                    ranked=index.size(metric_name),
+                    percentiles={ticker: index.percentile(metric_name, ticker) for ticker in (focus or members)},
+                    top=[RankedValue(ticker=ticker, value=value) for ticker, value in index.top(metric_name, k)],
+                    bottom=[RankedValue(ticker=ticker, value=value) for ticker, value in index.bottom(metric_name, k)],
+                )
+                for metric_name in dict.fromkeys(resolved.values())
+            ]
+    return PeerRankingResponse(universe=members, period=peer_ranking.RANK_PERIOD, rankings=rankings)
+
+@router.get("/rollup/{ticker}", response_model=MetricsRollup)
+def get_metrics_rollup(
+    ticker: str,
+    limit: int = Query(4, ge=1, le=40, description="Most recent quarters to report"),
+    stock_price: float = 0,
+    cost_of_equity: float = 0,
+    cagr_years: int = Query(3, ge=1, le=10)
+):
+    """Quarterly, TTM and growth metrics derived locally from a single quarterly fetch"""
+    history = rollups.history_needed(limit, cagr_years)
+    financials = get_all_financials(ticker=ticker, period=FinancialPeriod.QUARTERLY.value, limit=history).financials
+    if not financials.income_statements:
+        raise HTTPException(status_code=404, detail=f"No quarterly income statements found for {ticker}")
+
+    with span("metric_computation", category="rollup"):
+        return rollups.build_rollup(ticker, financials, limit, stock_price, cost_of_equity, cagr_years)
+
+@router.post("/sensitivity/{ticker}", response_model=SensitivityResponse)
+def get_metrics_sensitivity(ticker: str, payload: SensitivityPayload):
+    """Economic value and stock performance metrics over a stock price x cost of equity grid, from one fetch"""
+    metric_names, unknown = sensitivity.resolve_metrics(payload.metrics)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown or ambiguous metrics: {', '.join(unknown)}")
+
+    financials = get_all_financials(ticker=ticker, period=payload.period, limit=payload.limit).financials
+    if not financials.income_statements:
+        raise HTTPException(status_code=404, detail=f"No income statements found for {ticker}")
+
+    with span("metric_computation", category="sensitivity"):
+        return sensitivity.build_sensitivity(ticker, financials, payload, metric_names)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.telemetry import registry
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus scrape endpoint (``/metrics`` is taken by the ratios router)
+@router.get("", response_class=PlainTextResponse)
+def get_telemetry():
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,74 @@
+"""Export statements and all metric groups for a ticker universe to Parquet or Arrow IPC.
+
+    python -m app.export --tickers AAPL MSFT NVDA --output universe.parquet
+    python -m app.export --tickers-file universe.txt --period quarterly --limit 20 --workers 8 --output universe.arrow
+    python -m app.export --peer-group semiconductors --output semis.parquet
+
+The format follows the output suffix (``.arrow``/``.feather`` for Arrow IPC,
+anything else for Parquet) unless ``--format`` is given. Read the result in
+a notebook with ``pandas.read_parquet`` or ``pandas.read_feather``.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from app.core.telemetry import configure_logging
+from app.services.bulk_export import ExportSummary, export_universe
+from config import LOG_LEVEL, PEER_GROUPS
+
+
+def read_tickers(args: argparse.Namespace) -> List[str]:
+    """Tickers from every source, upper-cased and deduplicated in first-seen order."""
+    tickers = list(args.tickers or [])
+    if args.tickers_file:
+        tickers.extend(Path(args.tickers_file).read_text().split())
+    if args.peer_group:
+        if args.peer_group not in PEER_GROUPS:
+            sys.exit(f"Unknown peer group: {args.peer_group}")
+        tickers.extend(PEER_GROUPS[args.peer_group])
+    return list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", nargs="+", default=None)
+    parser.add_argument("--tickers-file", default=None, help="Whitespace-separated tickers")
+    parser.add_argument("--peer-group", default=None, choices=sorted(PEER_GROUPS))
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--format", default=None, choices=["parquet", "arrow"])
+    parser.add_argument("--period", default="annual", choices=["annual", "quarterly", "ttm"])
+    parser.add_argument("--limit", type=int, default=5, help="Report periods per ticker")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes; 0 runs in this process")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Tickers per worker task and row group")
+    args = parser.parse_args(argv)
+
+    configure_logging(LOG_LEVEL)
+    tickers = read_tickers(args)
+    if not tickers:
+        parser.error("no tickers given; use --tickers, --tickers-file or --peer-group")
+    format = args.format or ("arrow" if Path(args.output).suffix in (".arrow", ".feather") else "parquet")
+
+    def progress(summary: ExportSummary) -> None:
+        print(f"\r{summary.tickers + len(summary.failed)}/{len(tickers)} tickers, {summary.rows} rows", end="", file=sys.stderr, flush=True)
+
+    summary = export_universe(
+        tickers,
+        args.output,
+        period=args.period,
+        limit=args.limit,
+        format=format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        on_progress=progress,
+    )
+    print(file=sys.stderr)
+    print(f"Wrote {summary.rows} rows for {summary.tickers} tickers in {summary.row_groups} row groups to {args.output}")
+    if summary.failed:
+        print(f"Failed to fetch: {', '.join(summary.failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
-from app.endpoints.financial_datasets import company, financials, insider_transactions, prices
-from fastapi import FastAPI, Depends
+from app.endpoints.financial_datasets import company, financials, insider_transactions, prices, sec_fillings
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.endpoints import metrics
+from app.endpoints import metrics, telemetry
+from app.core.conditional import ConditionalRequestMiddleware, NotModified, not_modified_handler
+from app.core.telemetry import REQUEST_DURATION, configure_logging, observe
+from config import LOG_LEVEL
 import os
+import time
+
+configure_logging(LOG_LEVEL)
 
 app = FastAPI(title="AI Fund API")
 
@@ -16,13 +22,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(ConditionalRequestMiddleware)
+app.add_exception_handler(NotModified, not_modified_handler)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template rather than raw path to keep cardinality bounded
+    route = request.scope.get("route")
+    observe(
+        REQUEST_DURATION,
+        time.perf_counter() - start,
+        route=getattr(route, "path", "unmatched"),
+        method=request.method,
+        status=str(response.status_code),
+    )
+    return response
 
 app.include_router(company.router, prefix="/company", tags=["Company"])
 app.include_router(financials.router, prefix="/financials", tags=["Financials"])
 app.include_router(insider_transactions.router, prefix="/insider-transactions", tags=["Insider Transactions"])
 app.include_router(prices.router, prefix="/prices", tags=["Prices"])
+app.include_router(sec_fillings.router, prefix="/filings", tags=["Filings"])
 app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+app.include_router(telemetry.router, prefix="/internal/telemetry", tags=["Internal"])
 
 if __name__ == "__main__":
     import uvicorn
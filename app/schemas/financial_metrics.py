@@ -11,6 +11,7 @@ class MetricCategory(str, Enum):
     DUPONT = "dupont"
     ECONOMIC_VALUE = "economic_value"
     STOCK_PERFORMANCE = "stock_performance"
+    GROWTH = "growth"
 
 class MetricGroup(BaseModel):
     category: MetricCategory
@@ -23,4 +24,10 @@ class GroupedMetrics(BaseModel):
     groups: List[MetricGroup]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MetricsRollup(BaseModel):
+    """Quarterly metrics (with a growth group) and trailing-twelve-month metrics from one quarterly series"""
+    ticker: str
+    quarterly: List[GroupedMetrics]
+    ttm: List[GroupedMetrics]
@@ -0,0 +1,35 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+class InsiderWindowAggregate(BaseModel):
+    """Insider activity over the trailing ``window_days`` (shares and values are signed: buys positive)"""
+    window_days: int
+    net_shares: float
+    net_value: float
+    shares_bought: float
+    shares_sold: float
+    value_bought: float
+    value_sold: float
+    transactions: int
+    distinct_insiders: int
+
+class InsiderAggregatesResponse(BaseModel):
+    ticker: str
+    as_of: date
+    last_synced: Optional[datetime]
+    transactions_held: int
+    windows: List[InsiderWindowAggregate]
+
+class NetInsiderBuying(BaseModel):
+    """Only tickers requested through /aggregates are ranked; ``last_synced`` says how fresh each one is"""
+    ticker: str
+    net_value: float
+    net_shares: float
+    distinct_insiders: int
+    last_synced: Optional[datetime]
+
+class NetInsiderBuyingResponse(BaseModel):
+    window_days: int
+    as_of: date
+    results: List[NetInsiderBuying]
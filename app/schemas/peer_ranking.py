@@ -0,0 +1,19 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+class RankedValue(BaseModel):
+    ticker: str
+    value: float
+
+class MetricRanking(BaseModel):
+    """Percentiles (0-100, ties counted as half) and the K highest / lowest values of one metric"""
+    metric: str
+    ranked: int
+    percentiles: Dict[str, Optional[float]]
+    top: List[RankedValue]
+    bottom: List[RankedValue]
+
+class PeerRankingResponse(BaseModel):
+    universe: List[str]
+    period: str
+    rankings: List[MetricRanking]
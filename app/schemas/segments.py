@@ -0,0 +1,21 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+class SegmentSeries(BaseModel):
+    """One segment's values per report period (aligned with ``report_periods``)"""
+    key: str
+    values: List[Optional[float]]
+    share_of_total: List[Optional[float]]
+    growth: List[Optional[float]]
+
+class SegmentAxisPivot(BaseModel):
+    axis: str
+    totals: List[Optional[float]]
+    segments: List[SegmentSeries]
+
+class SegmentPivotResponse(BaseModel):
+    ticker: str
+    period: str
+    report_periods: List[date]
+    axes: List[SegmentAxisPivot]
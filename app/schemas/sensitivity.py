@@ -0,0 +1,33 @@
+from datetime import date
+from typing import Annotated, Dict, List, Optional, Union
+from pydantic import BaseModel, Field
+
+MAX_AXIS_VALUES = 1000
+
+class ValueRange(BaseModel):
+    """``num`` evenly spaced values from ``start`` to ``stop``, both included"""
+    start: float
+    stop: float
+    num: int = Field(..., ge=1, le=MAX_AXIS_VALUES)
+
+AxisValues = Union[Annotated[List[float], Field(min_length=1, max_length=MAX_AXIS_VALUES)], ValueRange]
+
+class SensitivityPayload(BaseModel):
+    stock_price: AxisValues = Field(..., description="Explicit prices or a start/stop/num range")
+    cost_of_equity: AxisValues = Field(..., description="Explicit rates or a start/stop/num range")
+    period: str = "annual"
+    limit: int = Field(1, ge=1, le=40)
+    metrics: Optional[List[str]] = Field(None, description="Defaults to every economic value and stock performance metric")
+
+class SensitivityMatrix(BaseModel):
+    """Values nested in ``axes`` order; input axes the metric does not vary along are left out"""
+    axes: List[str]
+    values: list
+
+class SensitivityResponse(BaseModel):
+    ticker: str
+    period: str
+    report_date: List[date]
+    stock_price: List[float]
+    cost_of_equity: List[float]
+    metrics: Dict[str, SensitivityMatrix]
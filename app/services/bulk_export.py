@@ -0,0 +1,214 @@
+"""Bulk export of statements and computed metrics for a ticker universe to Parquet or Arrow IPC.
+
+The universe is split into chunks that a process pool fetches and computes
+in parallel. Each chunk becomes one Arrow record batch: the merged statement
+fields of every report period plus every ``MetricCategory`` column
+(``"<category>.<metric>"``) that the statements alone determine. Metrics
+that need a stock price or a cost of equity are left out: one value would
+be wrong for every other ticker and report date. The parent writes each batch as its own row
+group as soon as it arrives, in submission order. At most ``2 x workers``
+chunks are in flight, so memory stays flat however large the universe is.
+Missing values and undefined ratios (division by zero) are written as nulls.
+"""
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+
+from app.agents.growth_metrics import growth_metrics, report_months, ttm_columns
+from app.agents.vectorized_metrics import (
+    STATEMENT_METRIC_NAMES,
+    calculate_metric_arrays,
+    flatten_metric_arrays,
+    statement_columns,
+)
+from app.core.upstream import executor, fetch_model
+from app.schemas.financial_metrics import MetricCategory
+from app.services.rollups import merge_statements
+from config import BASE_URL
+from models import AllFinancialsResponse, BalanceSheetModel, CashFlowStatementModel, IncomeStatementModel
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("parquet", "arrow")
+IDENTITY_COLUMNS = [
+    ("ticker", pa.string()),
+    ("report_period", pa.date32()),
+    ("period", pa.string()),
+    ("currency", pa.string()),
+]
+
+
+def numeric_fields(*models) -> List[str]:
+    """Float fields of the statement models, in declaration order and without repeats."""
+    fields = (
+        name
+        for model in models
+        for name, info in model.model_fields.items()
+        if info.annotation in (float, Optional[float])
+    )
+    return list(dict.fromkeys(fields))
+
+
+EXPORT_FIELDS = numeric_fields(IncomeStatementModel, BalanceSheetModel, CashFlowStatementModel)
+
+
+def metric_columns(period: str) -> List[str]:
+    """Growth compares consecutive quarters, so it is only exported for quarterly series."""
+    if period != "quarterly":
+        return list(STATEMENT_METRIC_NAMES)
+    return list(STATEMENT_METRIC_NAMES) + list(_growth_arrays([]))
+
+
+def export_schema(period: str) -> pa.Schema:
+    return pa.schema(
+        IDENTITY_COLUMNS
+        + [(name, pa.float64()) for name in EXPORT_FIELDS]
+        + [(name, pa.float64()) for name in metric_columns(period)]
+    )
+
+
+@dataclass
+class ExportSummary:
+    rows: int = 0
+    tickers: int = 0
+    row_groups: int = 0
+    failed: List[str] = field(default_factory=list)
+
+
+def fetch_financials(ticker: str, period: str, limit: int):
+    # Each ticker is read once per export; caching it would only grow the worker's memory and the shared cache
+    url = f"{BASE_URL}/financials?ticker={ticker}&period={period}&limit={limit}"
+    return fetch_model(AllFinancialsResponse, "all_financials", url, "Error fetching financials", cache=False).financials
+
+
+def export_chunk(tickers: Sequence[str], period: str, limit: int) -> Tuple[Optional[pa.RecordBatch], List[str]]:
+    """Fetch and compute one chunk; runs in a worker process. Returns the batch and the tickers that failed."""
+
+    def fetch(ticker: str):
+        try:
+            return fetch_financials(ticker, period, limit)
+        except HTTPException as e:
+            logger.warning("export fetch failed", extra={"ticker": ticker, "status": e.status_code})
+            return None
+
+    rows: List[Dict[str, object]] = []
+    growth_parts: List[Dict[str, np.ndarray]] = []
+    failed = []
+    for ticker, financials in zip(tickers, executor.map(fetch, tickers)):
+        if financials is None:
+            failed.append(ticker)
+            continue
+        ticker_rows = merge_statements(financials)
+        if period == "quarterly":
+            growth_parts.append(_growth_arrays(ticker_rows))
+        rows.extend(ticker_rows)
+    if not rows:
+        return None, failed
+
+    columns = statement_columns(rows, EXPORT_FIELDS)
+    metrics = flatten_metric_arrays(calculate_metric_arrays(columns))
+    if growth_parts:
+        metrics.update({name: np.concatenate([part[name] for part in growth_parts]) for name in growth_parts[0]})
+
+    schema = export_schema(period)
+    arrays = [
+        pa.array([row["ticker"] for row in rows], pa.string()),
+        pa.array([row["report_period"] for row in rows], pa.date32()),
+        pa.array([row.get("period") for row in rows], pa.string()),
+        pa.array([row.get("currency") for row in rows], pa.string()),
+    ]
+    for name in schema.names[len(IDENTITY_COLUMNS):]:
+        values = columns[name] if name in columns else metrics[name]
+        arrays.append(pa.array(values, pa.float64(), mask=~np.isfinite(values)))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema), failed
+
+
+def _growth_arrays(rows: List[Dict[str, object]], cagr_years: int = 3) -> Dict[str, np.ndarray]:
+    """Growth metrics for one ticker's quarterly rows (oldest first)."""
+    months = report_months(row["report_period"] for row in rows)
+    quarterly = statement_columns(rows, EXPORT_FIELDS)
+    growth = growth_metrics(quarterly, ttm_columns(quarterly, months), months, cagr_years)
+    return {f"{MetricCategory.GROWTH.value}.{name}": values for name, values in growth.items()}
+
+
+def chunked(tickers: Sequence[str], chunk_size: int) -> List[List[str]]:
+    return [list(tickers[i:i + chunk_size]) for i in range(0, len(tickers), chunk_size)]
+
+
+class _Writer:
+    """Row-group writer over Parquet or the Arrow IPC file format."""
+
+    def __init__(self, path: str, schema: pa.Schema, format: str):
+        if format == "parquet":
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(path, schema)
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def export_universe(
+    tickers: Iterable[str],
+    path: str,
+    period: str = "annual",
+    limit: int = 5,
+    format: str = "parquet",
+    workers: int = 0,
+    chunk_size: int = 50,
+    on_progress: Callable[[ExportSummary], None] | None = None,
+) -> ExportSummary:
+    """Write every ticker's statements and metrics to ``path``; ``workers=0`` computes in this process."""
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format: {format}")
+    chunks = chunked(list(dict.fromkeys(tickers)), chunk_size)
+    args = (period, limit)
+    summary = ExportSummary()
+    writer = _Writer(path, export_schema(period), format)
+
+    def record(batch: Optional[pa.RecordBatch], failed: List[str], chunk: List[str]) -> None:
+        summary.failed.extend(failed)
+        summary.tickers += len(chunk) - len(failed)
+        if batch is not None:
+            writer.write(batch)
+            summary.rows += batch.num_rows
+            summary.row_groups += 1
+        if on_progress is not None:
+            on_progress(summary)
+
+    try:
+        if workers <= 0:
+            for chunk in chunks:
+                record(*export_chunk(chunk, *args), chunk)
+            return summary
+
+        # Spawned workers start without the parent's threads and pooled connections
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending: Deque[Tuple[Future, List[str]]] = deque()
+            remaining = iter(chunks)
+
+            def submit_next() -> None:
+                chunk = next(remaining, None)
+                if chunk is not None:
+                    pending.append((pool.submit(export_chunk, chunk, *args), chunk))
+
+            for _ in range(2 * workers):
+                submit_next()
+            while pending:
+                future, chunk = pending.popleft()
+                submit_next()
+                record(*future.result(), chunk)
+        return summary
+    finally:
+        writer.close()
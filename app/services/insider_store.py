@@ -0,0 +1,219 @@
+"""Incrementally synced insider transactions with rolling per-ticker aggregates.
+
+Each ticker keeps the identities of the transactions it has seen and a
+filing-date cursor, so a sync only asks upstream for newer filings. Each
+trailing window (30/90/365 days) is a deque ordered by transaction date
+with running sums and an insider -> count map. New transactions are added
+to the sums as they arrive. Expired ones are subtracted from the front
+when a window is read. Reading aggregates is therefore amortised O(1) per
+ticker, and cross-ticker rankings only compare the precomputed values.
+"""
+import heapq
+import threading
+from bisect import bisect_right
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.schemas.insider_transactions import InsiderWindowAggregate, NetInsiderBuying
+from config import INSIDER_WINDOWS
+from models import InsiderTransactionModel
+
+TransactionKey = Tuple[object, ...]
+
+
+@dataclass(frozen=True)
+class Trade:
+    traded_on: date
+    insider: str
+    shares: float
+    value: float
+
+
+def transaction_key(transaction: InsiderTransactionModel) -> TransactionKey:
+    return (
+        transaction.name, transaction.transaction_date, transaction.filing_date,
+        transaction.transaction_shares, transaction.transaction_price_per_share, transaction.security_title,
+    )
+
+
+def to_trade(transaction: InsiderTransactionModel) -> Optional[Trade]:
+    """Signed shares and dollar value of one transaction; ``None`` when it moved no shares."""
+    shares = transaction.transaction_shares or 0.0
+    if not shares:
+        return None
+    value = transaction.transaction_value
+    if value is None:
+        value = abs(shares) * (transaction.transaction_price_per_share or 0.0)
+    sign = 1 if shares > 0 else -1
+    return Trade(
+        traded_on=transaction.transaction_date or transaction.filing_date,
+        insider=transaction.name or "unknown",
+        shares=shares,
+        value=sign * abs(value),
+    )
+
+
+class RollingWindow:
+    def __init__(self, days: int):
+        self.days = days
+        self.trades: Deque[Trade] = deque()
+        self.insiders: Counter = Counter()
+        self.shares_bought = self.shares_sold = 0.0
+        self.value_bought = self.value_sold = 0.0
+
+    def cutoff(self, today: date) -> date:
+        return today - timedelta(days=self.days)
+
+    def add(self, trade: Trade, today: date) -> None:
+        if trade.traded_on <= self.cutoff(today):
+            return
+        if not self.trades or self.trades[-1].traded_on <= trade.traded_on:
+            self.trades.append(trade)
+        else:
+            dates = [entry.traded_on for entry in self.trades]
+            self.trades.insert(bisect_right(dates, trade.traded_on), trade)
+        self._apply(trade, 1)
+
+    def expire(self, today: date) -> None:
+        cutoff = self.cutoff(today)
+        while self.trades and self.trades[0].traded_on <= cutoff:
+            self._apply(self.trades.popleft(), -1)
+        if not self.trades:
+            # Drop floating-point residue left by the running sums
+            self.shares_bought = self.shares_sold = 0.0
+            self.value_bought = self.value_sold = 0.0
+
+    def _apply(self, trade: Trade, direction: int) -> None:
+        if trade.shares > 0:
+            self.shares_bought += direction * trade.shares
+            self.value_bought += direction * trade.value
+        else:
+            self.shares_sold += direction * trade.shares
+            self.value_sold += direction * trade.value
+        self.insiders[trade.insider] += direction
+        if not self.insiders[trade.insider]:
+            del self.insiders[trade.insider]
+
+    @property
+    def net_value(self) -> float:
+        return self.value_bought + self.value_sold
+
+    def snapshot(self) -> InsiderWindowAggregate:
+        return InsiderWindowAggregate(
+            window_days=self.days,
+            net_shares=self.shares_bought + self.shares_sold,
+            net_value=self.net_value,
+            shares_bought=self.shares_bought,
+            shares_sold=self.shares_sold,
+            value_bought=self.value_bought,
+            value_sold=self.value_sold,
+            transactions=len(self.trades),
+            distinct_insiders=len(self.insiders),
+        )
+
+
+class TickerInsiders:
+    def __init__(self, windows: Iterable[int] = INSIDER_WINDOWS):
+        self.seen: Set[TransactionKey] = set()
+        self.cursor: Optional[date] = None
+        self.last_synced: Optional[datetime] = None
+        self.windows: Dict[int, RollingWindow] = {days: RollingWindow(days) for days in windows}
+
+
+class InsiderStore:
+    def __init__(self, windows: Iterable[int] = INSIDER_WINDOWS):
+        self.window_days = tuple(windows)
+        self.tickers: Dict[str, TickerInsiders] = {}
+        self.lock = threading.Lock()
+
+    def _ticker(self, ticker: str) -> TickerInsiders:
+        state = self.tickers.get(ticker)
+        if state is None:
+            state = self.tickers[ticker] = TickerInsiders(self.window_days)
+        return state
+
+    def cursor(self, ticker: str) -> Optional[date]:
+        state = self.tickers.get(ticker)
+        return state.cursor if state else None
+
+    def last_synced(self, ticker: str) -> Optional[datetime]:
+        state = self.tickers.get(ticker)
+        return state.last_synced if state else None
+
+    def has_seen(self, ticker: str, transaction: InsiderTransactionModel) -> bool:
+        state = self.tickers.get(ticker)
+        return state is not None and transaction_key(transaction) in state.seen
+
+    def record(
+        self, ticker: str, transactions: Iterable[InsiderTransactionModel], today: Optional[date] = None,
+        synced: bool = False, cursor_limit: Optional[date] = None,
+    ) -> int:
+        """Add unseen transactions to every window; returns how many were new.
+
+        The cursor moves to the newest filing date, but never past
+        ``cursor_limit`` (a date whose filings were not all fetched).
+        """
+        today = today or date.today()
+        added = 0
+        trades: List[Trade] = []
+        with self.lock:
+            state = self._ticker(ticker)
+            for transaction in transactions:
+                key = transaction_key(transaction)
+                if key in state.seen:
+                    continue
+                state.seen.add(key)
+                added += 1
+                filed = transaction.filing_date if cursor_limit is None else min(transaction.filing_date, cursor_limit)
+                if state.cursor is None or filed > state.cursor:
+                    state.cursor = filed
+                trade = to_trade(transaction)
+                if trade is not None:
+                    trades.append(trade)
+            # Upstream lists newest first; adding oldest first keeps each window add an append
+            trades.sort(key=lambda trade: trade.traded_on)
+            for window in state.windows.values():
+                for trade in trades:
+                    window.add(trade, today)
+            if synced:
+                state.last_synced = datetime.now(timezone.utc)
+        return added
+
+    def aggregates(self, ticker: str, today: Optional[date] = None) -> List[InsiderWindowAggregate]:
+        today = today or date.today()
+        with self.lock:
+            state = self._ticker(ticker)
+            for window in state.windows.values():
+                window.expire(today)
+            return [window.snapshot() for window in state.windows.values()]
+
+    def transactions_held(self, ticker: str) -> int:
+        state = self.tickers.get(ticker)
+        return len(state.seen) if state else 0
+
+    def top_net_buying(self, window_days: int, k: int, today: Optional[date] = None) -> List[NetInsiderBuying]:
+        """The ``k`` tickers with the largest net dollar value bought over ``window_days``.
+
+        Rows are built under the lock, since a concurrent sync mutates the windows.
+        """
+        today = today or date.today()
+        with self.lock:
+            windows = []
+            for ticker, state in self.tickers.items():
+                window = state.windows[window_days]
+                window.expire(today)
+                windows.append((ticker, state.last_synced, window))
+            return [
+                NetInsiderBuying(
+                    ticker=ticker,
+                    net_value=window.net_value,
+                    net_shares=window.shares_bought + window.shares_sold,
+                    distinct_insiders=len(window.insiders),
+                    last_synced=last_synced,
+                )
+                for ticker, last_synced, window in heapq.nlargest(k, windows, key=lambda entry: entry[2].net_value)
+            ]
+
+insider_store = InsiderStore()
@@ -0,0 +1,142 @@
+"""Chunked, cached fan-out for ``/financials/search/line-items``.
+
+Every (ticker, line_item, period) cell fetched from upstream is cached
+together with the ``limit`` it was fetched for, so overlapping searches only
+request the tickers and line items they are missing. Missing tickers are
+grouped by the exact set of line items they lack, split into evenly sized
+chunks, and fetched concurrently on the shared upstream executor.
+"""
+import math
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+
+from app.core.cache import TTLCache
+from app.core.upstream import executor, fetch_json, validate
+from config import BASE_URL, LINE_ITEMS_CACHE_MAX_ENTRIES, LINE_ITEMS_CACHE_TTL, LINE_ITEMS_CHUNK_SIZE
+from models import LineItemSearchResponse, LineItemSearchResultModel, LineItemsPayload
+
+
+@dataclass
+class LineItemCell:
+    """Values of one line item for one ticker, keyed by report period."""
+    limit: int
+    values: Dict[str, float | None] = field(default_factory=dict)
+
+
+CellKey = Tuple[str, str, str]
+
+cells = TTLCache(max_entries=LINE_ITEMS_CACHE_MAX_ENTRIES, ttl=LINE_ITEMS_CACHE_TTL)
+
+
+def plan_chunks(tickers: List[str], max_chunk_size: int) -> List[List[str]]:
+    """Split ``tickers`` into the fewest chunks of at most ``max_chunk_size``, balanced in size."""
+    if not tickers:
+        return []
+    chunk_count = math.ceil(len(tickers) / max_chunk_size)
+    size = math.ceil(len(tickers) / chunk_count)
+    return [tickers[start:start + size] for start in range(0, len(tickers), size)]
+
+
+def missing_line_items(ticker: str, payload: LineItemsPayload) -> Tuple[str, ...]:
+    missing = []
+    for line_item in payload.line_items:
+        cell = cells.get((ticker, line_item, payload.period))
+        if cell is None or cell.limit < payload.limit:
+            missing.append(line_item)
+    return tuple(missing)
+
+
+def plan_requests(payload: LineItemsPayload) -> Tuple[List[str], List[LineItemsPayload]]:
+    """Return the tickers already fully cached and the upstream requests needed for the rest."""
+    cached: List[str] = []
+    by_missing: Dict[Tuple[str, ...], List[str]] = {}
+    for ticker in dict.fromkeys(payload.tickers):
+        missing = missing_line_items(ticker, payload)
+        if not missing:
+            cached.append(ticker)
+            continue
+        by_missing.setdefault(missing, []).append(ticker)
+
+    requests = [
+        LineItemsPayload(line_items=list(line_items), tickers=chunk, period=payload.period, limit=payload.limit)
+        for line_items, tickers in by_missing.items()
+        for chunk in plan_chunks(tickers, LINE_ITEMS_CHUNK_SIZE)
+    ]
+    return cached, requests
+
+
+def fetch_chunk(request: LineItemsPayload) -> LineItemsPayload:
+    """Fetch one chunk from upstream and store every cell it covers, including empty ones."""
+    url = f"{BASE_URL}/financials/search/line-items"
+    data = fetch_json("line_item_search", url, "Error performing line items search", payload=request.dict())
+    response = validate(LineItemSearchResponse, data, "line_item_search")
+
+    fetched = {
+        (ticker, line_item): LineItemCell(limit=request.limit)
+        for ticker in request.tickers
+        for line_item in request.line_items
+    }
+    for row in response.search_results:
+        extras = row.model_extra or {}
+        for line_item in request.line_items:
+            cell = fetched.get((row.ticker, line_item))
+            if cell is not None:
+                cell.values[row.report_period.isoformat()] = extras.get(line_item)
+
+    for (ticker, line_item), cell in fetched.items():
+        cells.set((ticker, line_item, request.period), cell)
+    return request
+
+
+def assemble(ticker: str, payload: LineItemsPayload) -> List[LineItemSearchResultModel]:
+    """Merge the cached cells of ``ticker`` into result rows, newest report period first."""
+    rows: Dict[str, Dict[str, float | None]] = {}
+    for line_item in payload.line_items:
+        cell = cells.get((ticker, line_item, payload.period))
+        if cell is None:
+            continue
+        for report_period, value in cell.values.items():
+            rows.setdefault(report_period, {})[line_item] = value
+
+    return [
+        LineItemSearchResultModel(ticker=ticker, report_period=report_period, period=payload.period, **values)
+        for report_period, values in sorted(rows.items(), reverse=True)[:payload.limit]
+    ]
+
+
+def submit(requests: List[LineItemsPayload]) -> List[Future]:
+    return [executor.submit(fetch_chunk, request) for request in requests]
+
+
+def search_line_items(payload: LineItemsPayload) -> LineItemSearchResponse:
+    cached, requests = plan_requests(payload)
+    for future in submit(requests):
+        future.result()
+
+    results: List[LineItemSearchResultModel] = []
+    for ticker in dict.fromkeys(payload.tickers):
+        results.extend(assemble(ticker, payload))
+    return LineItemSearchResponse(search_results=results)
+
+
+def stream_line_items(payload: LineItemsPayload) -> Iterator[LineItemSearchResultModel | Dict[str, object]]:
+    """Yield cached rows immediately, then each chunk's rows as soon as it completes.
+
+    A failed chunk yields an ``{"error", "tickers"}`` record instead of
+    aborting rows that have already been streamed.
+    """
+    cached, requests = plan_requests(payload)
+    futures = submit(requests)
+    for ticker in cached:
+        yield from assemble(ticker, payload)
+
+    for future in as_completed(futures):
+        try:
+            request = future.result()
+        except Exception as e:
+            request = requests[futures.index(future)]
+            yield {"error": getattr(e, "detail", str(e)), "tickers": request.tickers}
+            continue
+        for ticker in request.tickers:
+            yield from assemble(ticker, payload)
@@ -0,0 +1,171 @@
+"""Cross-sectional percentile and top-K rankings over a universe of tickers.
+
+Each ticker's latest annual statements are reduced to one vector of every
+``FinancialMetrics`` metric computed from the statements alone (with
+``vectorized_metrics``); metrics that need a stock price or a cost of
+equity are not ranked. Every
+universe that has been queried keeps one sorted index per metric, built in
+a single vectorized pass and then updated incrementally: when the statement
+store reports new statements for a ticker, only that ticker's entries are
+moved in the indexes that contain it.
+"""
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.vectorized_metrics import (
+    STATEMENT_METRIC_NAMES,
+    calculate_metric_arrays,
+    flatten_metric_arrays,
+    statement_columns,
+)
+from app.services.statement_store import SortedIndex, StatementStore, statement_store
+from config import RANK_INDEX_MAX_UNIVERSES
+
+RANK_PERIOD = "annual"
+REQUIRED_KINDS = ("income_statements", "balance_sheets", "cash_flow_statements")
+# One field per statement kind; a row missing any of them is incomplete
+COMPLETENESS_FIELDS = ("revenue", "total_assets", "net_cash_flow_from_operations")
+
+UniverseKey = str | FrozenSet[str]
+
+
+class RankIndex:
+    """Per-metric sorted (value, ticker) indexes over one universe."""
+
+    def __init__(self, members: Iterable[str]):
+        self.members = frozenset(members)
+        self.metrics: Dict[str, SortedIndex] = {name: SortedIndex() for name in STATEMENT_METRIC_NAMES}
+        self.values: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def build(cls, members: Iterable[str], vectors: Dict[str, Dict[str, float]]) -> "RankIndex":
+        index = cls(members)
+        ranked = sorted(ticker for ticker in index.members if ticker in vectors)
+        for name, metric_index in index.metrics.items():
+            pairs = sorted(
+                (vectors[ticker][name], ticker) for ticker in ranked if math.isfinite(vectors[ticker][name])
+            )
+            metric_index.values = [value for value, _ in pairs]
+            metric_index.ids = [ticker for _, ticker in pairs]
+        index.values = {ticker: vectors[ticker] for ticker in ranked}
+        return index
+
+    def update(self, ticker: str, vector: Dict[str, float]) -> None:
+        previous = self.values.get(ticker, {})
+        for name, metric_index in self.metrics.items():
+            old, new = previous.get(name, math.nan), vector[name]
+            if old == new:
+                continue
+            if math.isfinite(old):
+                metric_index.remove(old, ticker)
+            if math.isfinite(new):
+                metric_index.add(new, ticker)
+        self.values[ticker] = vector
+
+    def percentile(self, metric: str, ticker: str) -> Optional[float]:
+        """Share of the ranked universe below the ticker's value, counting ties as half."""
+        value = self.values.get(ticker, {}).get(metric, math.nan)
+        metric_index = self.metrics[metric]
+        if not math.isfinite(value) or not metric_index.values:
+            return None
+        below = bisect_left(metric_index.values, value)
+        equal = bisect_right(metric_index.values, value) - below
+        return 100 * (below + 0.5 * equal) / len(metric_index.values)
+
+    def top(self, metric: str, k: int) -> List[Tuple[str, float]]:
+        if k <= 0:
+            return []
+        metric_index = self.metrics[metric]
+        return list(zip(reversed(metric_index.ids[-k:]), reversed(metric_index.values[-k:])))
+
+    def bottom(self, metric: str, k: int) -> List[Tuple[str, float]]:
+        metric_index = self.metrics[metric]
+        return list(zip(metric_index.ids[:k], metric_index.values[:k]))
+
+    def size(self, metric: str) -> int:
+        return len(self.metrics[metric].values)
+
+
+class PeerRanker:
+    def __init__(self, store: StatementStore = statement_store, max_universes: int = RANK_INDEX_MAX_UNIVERSES):
+        self.store = store
+        self.max_universes = max_universes
+        self.vectors: Dict[str, Dict[str, float]] = {}
+        self.indexes: "OrderedDict[UniverseKey, RankIndex]" = OrderedDict()
+        self.lock = threading.RLock()
+        store.subscribe(self.on_statements_changed)
+
+    def latest_complete_row(self, ticker: str) -> Optional[dict]:
+        for row in reversed(self.store.rows_for(ticker, RANK_PERIOD)):
+            if all(row.get(field) is not None for field in COMPLETENESS_FIELDS):
+                return row
+        return None
+
+    def compute_vectors(self, tickers: List[str]) -> Dict[str, Dict[str, float]]:
+        """Metric vectors for every ticker with complete statements, in one vectorized pass."""
+        rows = {ticker: self.latest_complete_row(ticker) for ticker in tickers}
+        rows = {ticker: row for ticker, row in rows.items() if row is not None}
+        if not rows:
+            return {}
+        arrays = flatten_metric_arrays(calculate_metric_arrays(statement_columns(rows.values())))
+        matrix = np.column_stack([arrays[name] for name in STATEMENT_METRIC_NAMES])
+        return {
+            ticker: dict(zip(STATEMENT_METRIC_NAMES, values.tolist()))
+            for ticker, values in zip(rows, matrix)
+        }
+
+    def on_statements_changed(self, ticker: str, period: str) -> None:
+        if period != RANK_PERIOD or not self.is_tracked(ticker):
+            return
+        vector = self.compute_vectors([ticker]).get(ticker)
+        if vector is None:
+            return
+        with self.lock:
+            self.vectors[ticker] = vector
+            for index in self.indexes.values():
+                if ticker in index.members:
+                    index.update(ticker, vector)
+
+    def is_tracked(self, ticker: str) -> bool:
+        """Whether a vector or an index holds the ticker; others are computed when a universe first needs them."""
+        with self.lock:
+            return ticker in self.vectors or any(ticker in index.members for index in self.indexes.values())
+
+    def index_for(self, key: UniverseKey, members: Iterable[str]) -> RankIndex:
+        with self.lock:
+            index = self.indexes.get(key)
+            if index is not None:
+                self.indexes.move_to_end(key)
+                return index
+
+            members = list(dict.fromkeys(members))
+            missing = [ticker for ticker in members if ticker not in self.vectors]
+            self.vectors.update(self.compute_vectors(missing))
+            index = self.indexes[key] = RankIndex.build(members, self.vectors)
+            while len(self.indexes) > self.max_universes:
+                self.indexes.popitem(last=False)
+            return index
+
+    def resolve_metric(self, name: str) -> Optional[str]:
+        """Accept ``"<category>.<metric>"`` or a bare metric name that is unique across categories.
+
+        Metrics that depend on a stock price or a cost of equity resolve to None.
+        """
+        if name in STATEMENT_METRIC_NAMES:
+            return name
+        candidates = [metric for metric in STATEMENT_METRIC_NAMES if metric.split(".", 1)[1] == name]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def missing_tickers(self, tickers: Iterable[str]) -> List[str]:
+        return [
+            ticker for ticker in dict.fromkeys(tickers)
+            if not self.store.has_statements(ticker, RANK_PERIOD, REQUIRED_KINDS)
+        ]
+
+
+peer_ranker = PeerRanker()
@@ -0,0 +1,88 @@
+"""Quarterly, TTM and growth metric views built from a single quarterly statement series.
+
+The three statement lists are merged per report period, the TTM series is
+derived with sliding four-quarter sums, and every metric category is then
+evaluated over whole columns at once, for the quarterly and TTM series
+alike. Growth needs the quarters before the ones reported, so callers fetch
+``history_needed(limit, cagr_years)`` quarters.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.agents.growth_metrics import (
+    QUARTERS_PER_YEAR,
+    ROLLUP_FIELDS,
+    growth_metrics,
+    is_contiguous,
+    report_months,
+    ttm_columns,
+)
+from app.agents.vectorized_metrics import calculate_metric_arrays, statement_columns
+from app.schemas.financial_metrics import GroupedMetrics, MetricCategory, MetricGroup, MetricsRollup
+from models import FinancialsModel
+
+QUARTERLY = "quarterly"
+TTM = "ttm"
+
+
+def history_needed(limit: int, cagr_years: int) -> int:
+    """Quarters to fetch so the oldest reported quarter still has its TTM CAGR."""
+    return limit + QUARTERS_PER_YEAR * cagr_years + QUARTERS_PER_YEAR - 1
+
+
+def merge_statements(financials: FinancialsModel) -> List[Dict[str, object]]:
+    """One row per report period with the fields of all three statements, oldest first."""
+    rows: Dict[object, Dict[str, object]] = {}
+    for statement in (*financials.income_statements, *financials.balance_sheets, *financials.cash_flow_statements):
+        rows.setdefault(statement.report_period, {}).update(statement.model_dump())
+    return [rows[report_period] for report_period in sorted(rows)]
+
+
+def to_optional_floats(values: np.ndarray) -> List[Optional[float]]:
+    return [value if np.isfinite(value) else None for value in values.tolist()]
+
+
+def build_rollup(
+    ticker: str,
+    financials: FinancialsModel,
+    limit: int,
+    stock_price: float = 0.0,
+    cost_of_equity: float = 0.0,
+    cagr_years: int = 3,
+) -> MetricsRollup:
+    rows = merge_statements(financials)
+    months = report_months(row["report_period"] for row in rows)
+    quarterly = statement_columns(rows, ROLLUP_FIELDS)
+    ttm = ttm_columns(quarterly, months)
+
+    quarterly_groups = calculate_metric_arrays(quarterly, stock_price, cost_of_equity)
+    quarterly_groups[MetricCategory.GROWTH] = growth_metrics(quarterly, ttm, months, cagr_years)
+    ttm_groups = calculate_metric_arrays(ttm, stock_price, cost_of_equity)
+    has_ttm = is_contiguous(months, QUARTERS_PER_YEAR - 1)
+
+    reported = range(len(rows) - 1, max(len(rows) - limit, 0) - 1, -1)
+    return MetricsRollup(
+        ticker=ticker,
+        quarterly=_grouped(rows, quarterly_groups, QUARTERLY, reported),
+        ttm=_grouped(rows, ttm_groups, TTM, [i for i in reported if has_ttm[i]]),
+    )
+
+
+def _grouped(rows, groups: Dict[MetricCategory, Dict[str, np.ndarray]], period: str, indices) -> List[GroupedMetrics]:
+    """GroupedMetrics for the given row indices, newest first like the upstream responses."""
+    values = {
+        category: {name: to_optional_floats(np.asarray(array, dtype=float)) for name, array in metrics.items()}
+        for category, metrics in groups.items()
+    }
+    return [
+        GroupedMetrics(
+            period=period,
+            report_date=rows[i]["report_period"],
+            groups=[
+                MetricGroup(category=category, metrics={name: column[i] for name, column in metrics.items()})
+                for category, metrics in values.items()
+            ],
+        )
+        for i in indices
+    ]
@@ -0,0 +1,143 @@
+"""Local evaluation of ``FinancialSearchPayload`` screens against the statement store.
+
+Each filter is turned into a value range on one field and read straight off
+that field's sorted index; the row-id slices are intersected starting from
+the narrowest. Results are ordered by report period in ``payload.order``
+(ties keep insertion order): small match sets are sorted, large ones are
+taken by walking the report-period index until ``limit`` rows are found.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from fastapi import HTTPException
+
+from app.services.statement_store import FIELD_KINDS, REPORT_PERIOD, StatementStore, statement_store
+from config import SCREEN_HISTORY_LIMIT
+from models import FinancialSearchPayload, FinancialSearchResponse, SearchResultModel
+
+OPERATORS: Dict[str, str] = {
+    "gt": "gt", ">": "gt",
+    "gte": "gte", ">=": "gte",
+    "lt": "lt", "<": "lt",
+    "lte": "lte", "<=": "lte",
+    "eq": "eq", "=": "eq", "==": "eq",
+}
+
+SORT_TO_WALK_RATIO = 8
+
+
+@dataclass
+class RangeFilter:
+    field: str
+    low: Optional[float] = None
+    high: Optional[float] = None
+    include_low: bool = True
+    include_high: bool = True
+
+
+def parse_filters(filters: List[dict]) -> List[RangeFilter]:
+    parsed = []
+    for raw in filters:
+        field, operator, value = raw.get("field"), OPERATORS.get(str(raw.get("operator")).lower()), raw.get("value")
+        if field not in FIELD_KINDS:
+            raise HTTPException(status_code=400, detail=f"Unknown filter field: {field}")
+        if operator is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported filter operator: {raw.get('operator')}")
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise HTTPException(status_code=400, detail=f"Filter value for {field} must be numeric")
+
+        if operator == "eq":
+            parsed.append(RangeFilter(field, low=value, high=value))
+        elif operator in ("gt", "gte"):
+            parsed.append(RangeFilter(field, low=value, include_low=operator == "gte"))
+        else:
+            parsed.append(RangeFilter(field, high=value, include_high=operator == "lte"))
+    return parsed
+
+
+def required_kinds(payload: FinancialSearchPayload) -> Set[str]:
+    """Statement kinds a ticker must be held with for the screen to be answered locally."""
+    return {FIELD_KINDS[flt.field] for flt in parse_filters(payload.filters)} or {"income_statements"}
+
+
+def missing_tickers(payload: FinancialSearchPayload, store: StatementStore = statement_store) -> List[str]:
+    """Tickers to fetch before screening: not held, or held with less history than a fetched ticker gets."""
+    kinds = required_kinds(payload)
+    return [
+        ticker for ticker in dict.fromkeys(payload.tickers or [])
+        if not store.has_statements(ticker, payload.period, kinds, periods=SCREEN_HISTORY_LIMIT)
+    ]
+
+
+def can_screen_locally(payload: FinancialSearchPayload) -> bool:
+    """Only screens naming their tickers; the store holds whatever was fetched, not the whole universe."""
+    return payload.tickers is not None
+
+
+def screen(payload: FinancialSearchPayload, store: StatementStore = statement_store) -> FinancialSearchResponse:
+    if payload.order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail=f"Unsupported order: {payload.order}")
+
+    filters = parse_filters(payload.filters)
+    tickers = set(payload.tickers) if payload.tickers is not None else None
+    is_descending = payload.order == "desc"
+
+    with store.lock:
+        if filters:
+            matched = _filtered_row_ids(filters, payload.period, store)
+            if tickers is not None:
+                matched = {row_id for row_id in matched if store.rows[row_id]["ticker"] in tickers}
+            rows = _ordered_matches(matched, payload.period, is_descending, payload.limit, store)
+        else:
+            rows = _ordered_rows(payload.period, tickers, is_descending, payload.limit, store)
+
+        results = [
+            SearchResultModel(ticker=row["ticker"], report_period=row[REPORT_PERIOD], period=row["period"])
+            for row in rows
+        ]
+    return FinancialSearchResponse(search_results=results)
+
+
+def _filtered_row_ids(filters: List[RangeFilter], period: str, store: StatementStore) -> Set[int]:
+    slices = []
+    for flt in filters:
+        index = store.index(period, flt.field)
+        if index is None:
+            return set()
+        start, end = index.bounds(flt.low, flt.high, flt.include_low, flt.include_high)
+        slices.append(index.ids[start:end])
+    slices.sort(key=len)
+    return set(slices[0]).intersection(*slices[1:])
+
+
+def _ordered_matches(matched: Set[int], period: str, is_descending: bool, limit: int, store: StatementStore) -> List[dict]:
+    # Walking the report-period index is cheaper than sorting once matches far outnumber ``limit``
+    if len(matched) > limit * SORT_TO_WALK_RATIO:
+        index = store.index(period, REPORT_PERIOD)
+        row_ids = reversed(index.ids) if is_descending else iter(index.ids)
+        ordered = []
+        for row_id in row_ids:
+            if row_id in matched:
+                ordered.append(store.rows[row_id])
+                if len(ordered) == limit:
+                    break
+        return ordered
+
+    row_ids = sorted(matched, key=lambda row_id: (store.rows[row_id][REPORT_PERIOD], row_id), reverse=is_descending)
+    return [store.rows[row_id] for row_id in row_ids[:limit]]
+
+
+def _ordered_rows(period: str, tickers: Optional[Set[str]], is_descending: bool, limit: int, store: StatementStore) -> List[dict]:
+    index = store.index(period, REPORT_PERIOD)
+    if index is None:
+        return []
+    row_ids = reversed(index.ids) if is_descending else iter(index.ids)
+    rows = []
+    for row_id in row_ids:
+        row = store.rows[row_id]
+        if tickers is not None and row["ticker"] not in tickers:
+            continue
+        rows.append(row)
+        if len(rows) == limit:
+            break
+    return rows
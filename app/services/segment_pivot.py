@@ -0,0 +1,123 @@
+"""Server-side pivot of ``SegmentedFinancialModel.items`` by axis and key across report periods.
+
+Items are first packed into columns: axis and key strings are interned to
+integer codes, and values go into one float array. Each (axis, key)
+segment becomes a row of a segments x periods matrix built with a single
+``bincount``. Totals, shares of total and period-over-period growth
+(``growth_metrics.change``, as in the metrics rollups) are then
+whole-matrix operations. Cells with no reported value are ``None``
+rather than zero.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.growth_metrics import change
+from app.core.cache import TTLCache
+from app.schemas.segments import SegmentAxisPivot, SegmentPivotResponse, SegmentSeries
+from config import SEGMENT_PIVOT_CACHE_MAX_ENTRIES, SEGMENT_PIVOT_CACHE_TTL
+from models import SegmentedFinancialModel
+
+pivot_cache = TTLCache(max_entries=SEGMENT_PIVOT_CACHE_MAX_ENTRIES, ttl=SEGMENT_PIVOT_CACHE_TTL)
+
+
+class Interner:
+    """Maps strings to dense integer codes; each distinct string is stored once."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+
+@dataclass
+class SegmentColumns:
+    report_periods: List[date]
+    axes: List[str]
+    keys: List[str]
+    segment_axes: np.ndarray
+    segment_keys: np.ndarray
+    segment_codes: np.ndarray
+    period_codes: np.ndarray
+    values: np.ndarray
+
+
+def to_columns(segmented: List[SegmentedFinancialModel]) -> SegmentColumns:
+    report_periods = sorted({statement.report_period for statement in segmented})
+    period_index = {report_period: code for code, report_period in enumerate(report_periods)}
+    axes, keys = Interner(), Interner()
+    segments: Dict[Tuple[int, int], int] = {}
+
+    segment_codes, period_codes, values = [], [], []
+    for statement in segmented:
+        period_code = period_index[statement.report_period]
+        for item in statement.items:
+            pair = (axes.code(item.axis), keys.code(item.key))
+            segment_code = segments.get(pair)
+            if segment_code is None:
+                segment_code = segments[pair] = len(segments)
+            segment_codes.append(segment_code)
+            period_codes.append(period_code)
+            values.append(item.value)
+
+    return SegmentColumns(
+        report_periods=report_periods,
+        axes=axes.strings,
+        keys=keys.strings,
+        segment_axes=np.fromiter((axis for axis, _ in segments), dtype=np.int64, count=len(segments)),
+        segment_keys=np.fromiter((key for _, key in segments), dtype=np.int64, count=len(segments)),
+        segment_codes=np.asarray(segment_codes, dtype=np.int64),
+        period_codes=np.asarray(period_codes, dtype=np.int64),
+        values=np.asarray(values, dtype=float),
+    )
+
+
+def _nullable(values: np.ndarray) -> List[Optional[float]]:
+    return [None if not np.isfinite(value) else float(value) for value in values]
+
+
+def pivot(ticker: str, period: str, segmented: List[SegmentedFinancialModel]) -> SegmentPivotResponse:
+    columns = to_columns(segmented)
+    segment_count, period_count = len(columns.segment_axes), len(columns.report_periods)
+    cells = columns.segment_codes * period_count + columns.period_codes
+    size = segment_count * period_count
+
+    sums = np.bincount(cells, weights=columns.values, minlength=size).reshape(segment_count, period_count)
+    present = np.bincount(cells, minlength=size).reshape(segment_count, period_count) > 0
+    matrix = np.where(present, sums, np.nan)
+
+    totals = np.zeros((len(columns.axes), period_count))
+    np.add.at(totals, columns.segment_axes, np.where(present, sums, 0.0))
+    axis_present = np.zeros((len(columns.axes), period_count), dtype=bool)
+    np.logical_or.at(axis_present, columns.segment_axes, present)
+    totals = np.where(axis_present, totals, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = matrix / totals[columns.segment_axes]
+        growth = np.full_like(matrix, np.nan)
+        growth[:, 1:] = change(matrix[:, 1:], matrix[:, :-1])
+
+    pivoted = []
+    for axis_code, axis in enumerate(columns.axes):
+        pivoted.append(SegmentAxisPivot(
+            axis=axis,
+            totals=_nullable(totals[axis_code]),
+            segments=[
+                SegmentSeries(
+                    key=columns.keys[columns.segment_keys[row]],
+                    values=_nullable(matrix[row]),
+                    share_of_total=_nullable(shares[row]),
+                    growth=_nullable(growth[row]),
+                )
+                for row in np.flatnonzero(columns.segment_axes == axis_code)
+            ],
+        ))
+    return SegmentPivotResponse(ticker=ticker, period=period, report_periods=columns.report_periods, axes=pivoted)
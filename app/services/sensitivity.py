@@ -0,0 +1,85 @@
+"""Economic value and stock performance metrics over a grid of stock prices and costs of equity.
+
+Statement columns are shaped ``(periods, 1, 1)``, stock prices
+``(1, prices, 1)`` and costs of equity ``(1, 1, costs)``, so a single call
+of each ``vectorized_metrics`` formula broadcasts over the whole grid. Each
+metric keeps only the axes it varies along: ``economic_margin`` comes back
+as periods x costs of equity, ``market_value`` as periods x prices, and
+``earnings_per_share`` as one value per period.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.agents.vectorized_metrics import (
+    METRIC_NAMES,
+    economic_value_ratios,
+    flatten_metric_arrays,
+    statement_columns,
+    stock_performance_ratios,
+)
+from app.schemas.financial_metrics import MetricCategory
+from app.schemas.sensitivity import AxisValues, SensitivityMatrix, SensitivityPayload, SensitivityResponse, ValueRange
+from app.services.rollups import merge_statements
+from models import FinancialsModel
+
+AXES = ("report_date", "stock_price", "cost_of_equity")
+SENSITIVE_CATEGORIES = (MetricCategory.ECONOMIC_VALUE, MetricCategory.STOCK_PERFORMANCE)
+SENSITIVITY_METRICS: List[str] = [
+    name for name in METRIC_NAMES if name.split(".", 1)[0] in {category.value for category in SENSITIVE_CATEGORIES}
+]
+
+
+def axis_values(spec: AxisValues) -> np.ndarray:
+    if isinstance(spec, ValueRange):
+        return np.linspace(spec.start, spec.stop, spec.num)
+    return np.asarray(spec, dtype=float)
+
+
+def resolve_metrics(names: Optional[Sequence[str]]) -> Tuple[List[str], List[str]]:
+    """Resolved ``"<category>.<metric>"`` names and the ones that matched nothing (or several)."""
+    if names is None:
+        return list(SENSITIVITY_METRICS), []
+    resolved, unknown = [], []
+    for name in names:
+        candidates = [metric for metric in SENSITIVITY_METRICS if name in (metric, metric.split(".", 1)[1])]
+        if len(candidates) == 1:
+            resolved.append(candidates[0])
+        else:
+            unknown.append(name)
+    return list(dict.fromkeys(resolved)), unknown
+
+
+def sensitivity_grid(columns: Dict[str, np.ndarray], stock_prices: np.ndarray, costs_of_equity: np.ndarray) -> Dict[str, np.ndarray]:
+    """Every sensitive metric broadcast over periods x stock prices x costs of equity."""
+    c = {field: values[:, None, None] for field, values in columns.items()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return flatten_metric_arrays({
+            MetricCategory.ECONOMIC_VALUE: economic_value_ratios(c, costs_of_equity[None, None, :]),
+            MetricCategory.STOCK_PERFORMANCE: stock_performance_ratios(c, stock_prices[None, :, None]),
+        })
+
+
+def to_matrix(values: np.ndarray) -> SensitivityMatrix:
+    kept = [0] + [axis for axis in (1, 2) if values.shape[axis] > 1]
+    values = values.reshape([values.shape[axis] for axis in kept])
+    return SensitivityMatrix(
+        axes=[AXES[axis] for axis in kept],
+        values=np.where(np.isfinite(values), values, None).tolist(),
+    )
+
+
+def build_sensitivity(ticker: str, financials: FinancialsModel, payload: SensitivityPayload, metrics: List[str]) -> SensitivityResponse:
+    # Newest report period first, like the upstream responses
+    rows = merge_statements(financials)[::-1]
+    stock_prices = axis_values(payload.stock_price)
+    costs_of_equity = axis_values(payload.cost_of_equity)
+    grid = sensitivity_grid(statement_columns(rows), stock_prices, costs_of_equity)
+    return SensitivityResponse(
+        ticker=ticker,
+        period=payload.period,
+        report_date=[row["report_period"] for row in rows],
+        stock_price=stock_prices.tolist(),
+        cost_of_equity=costs_of_equity.tolist(),
+        metrics={name: to_matrix(grid[name]) for name in metrics},
+    )
@@ -0,0 +1,219 @@
+"""In-memory store of recently fetched statements, with sorted per-field indexes.
+
+Rows merge the income statement, balance sheet and cash flow statement of one
+(ticker, period, report_period). For each period and numeric field the store
+keeps a sorted index, so range queries are answered by bisection instead of
+a full scan. The indexes are updated incrementally as statements arrive.
+
+The store is bounded per (ticker, period): each holds the time it was last
+fetched, is dropped once it is older than ``ttl`` (so restatements are picked
+up on the next fetch), and the least recently recorded or read ones are
+evicted beyond ``max_tickers``.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from config import STATEMENT_STORE_MAX_TICKERS, STATEMENT_STORE_TTL
+from models import BalanceSheetModel, CashFlowStatementModel, IncomeStatementModel
+
+STATEMENT_KINDS: Dict[type, str] = {
+    IncomeStatementModel: "income_statements",
+    BalanceSheetModel: "balance_sheets",
+    CashFlowStatementModel: "cash_flow_statements",
+}
+
+IDENTITY_FIELDS = {"ticker", "calendar_date", "report_period", "period", "currency"}
+
+# Numeric field -> statement kind that reports it
+FIELD_KINDS: Dict[str, str] = {
+    name: kind
+    for model, kind in STATEMENT_KINDS.items()
+    for name in model.model_fields
+    if name not in IDENTITY_FIELDS
+}
+
+REPORT_PERIOD = "report_period"
+
+RowKey = Tuple[str, str, date]
+TickerKey = Tuple[str, str]
+Listener = Callable[[str, str], None]
+
+
+class SortedIndex:
+    """Parallel sorted value / row-id lists answering range queries by bisection."""
+
+    __slots__ = ("values", "ids")
+
+    def __init__(self):
+        self.values: List[float] = []
+        self.ids: List[int] = []
+
+    def add(self, value: float, row_id: int) -> None:
+        position = bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.ids.insert(position, row_id)
+
+    def remove(self, value: float, row_id: int) -> None:
+        start, end = bisect_left(self.values, value), bisect_right(self.values, value)
+        position = self.ids.index(row_id, start, end)
+        del self.values[position]
+        del self.ids[position]
+
+    def bounds(self, low: Optional[float], high: Optional[float], include_low: bool, include_high: bool) -> Tuple[int, int]:
+        """Positions ``[start, end)`` of values within the given range."""
+        start = 0
+        if low is not None:
+            start = bisect_left(self.values, low) if include_low else bisect_right(self.values, low)
+        end = len(self.values)
+        if high is not None:
+            end = bisect_right(self.values, high) if include_high else bisect_left(self.values, high)
+        return start, max(start, end)
+
+
+class StatementStore:
+    def __init__(self, max_tickers: int = STATEMENT_STORE_MAX_TICKERS, ttl: float = STATEMENT_STORE_TTL):
+        self.max_tickers = max_tickers
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.rows: Dict[int, Dict[str, object]] = {}
+        self._next_row_id = 0
+        self._row_ids: Dict[RowKey, int] = {}
+        self._indexes: Dict[Tuple[str, str], SortedIndex] = {}
+        # (ticker, period) -> statement kind -> how many of the latest report periods are held
+        self._coverage: Dict[TickerKey, Dict[str, int]] = {}
+        self._ticker_rows: Dict[TickerKey, List[int]] = {}
+        # (ticker, period) -> wall time of the last fetch, least recently used first
+        self._fetched_at: "OrderedDict[TickerKey, float]" = OrderedDict()
+        self._listeners: List[Listener] = []
+
+    def subscribe(self, listener: Listener) -> None:
+        """Call ``listener(ticker, period)`` whenever a ticker's statements change."""
+        self._listeners.append(listener)
+
+    def record(self, statements: Iterable[BaseModel], limit: Optional[int] = None) -> None:
+        """Merge validated statements into the store, re-indexing only changed fields.
+
+        ``limit`` is how many of the latest report periods the fetch asked
+        for. Upstream returns fewer only when it has no more, so each kind is
+        then held ``limit`` periods deep; without it only the rows received count.
+        """
+        changed: Set[TickerKey] = set()
+        received: Counter = Counter()
+        fetched_at = time.time()
+        with self.lock:
+            for statement in statements:
+                kind = STATEMENT_KINDS[type(statement)]
+                key = (statement.ticker, statement.period, statement.report_period)
+                ticker_key = (statement.ticker, statement.period)
+                if self._is_stale(ticker_key, fetched_at):
+                    self._evict(ticker_key)
+                received[ticker_key, kind] += 1
+                self._fetched_at[ticker_key] = fetched_at
+                self._fetched_at.move_to_end(ticker_key)
+                if self._merge(key, statement):
+                    changed.add(ticker_key)
+            for (ticker_key, kind), count in received.items():
+                coverage = self._coverage.setdefault(ticker_key, {})
+                coverage[kind] = max(coverage.get(kind, 0), count, limit or 0)
+            while len(self._fetched_at) > self.max_tickers:
+                self._evict(next(iter(self._fetched_at)))
+        for ticker, period in changed:
+            for listener in self._listeners:
+                listener(ticker, period)
+
+    def _merge(self, key: RowKey, statement: BaseModel) -> bool:
+        ticker, period, report_period = key
+        row_id = self._row_ids.get(key)
+        if row_id is None:
+            row_id = self._next_row_id
+            self._next_row_id += 1
+            self._row_ids[key] = row_id
+            self.rows[row_id] = {"ticker": ticker, "period": period, REPORT_PERIOD: report_period}
+            self._ticker_rows.setdefault((ticker, period), []).append(row_id)
+            self._index(period, REPORT_PERIOD).add(report_period.toordinal(), row_id)
+
+        row = self.rows[row_id]
+        is_changed = False
+        for name, value in statement:
+            if name in IDENTITY_FIELDS or row.get(name) == value:
+                continue
+            index = self._index(period, name)
+            if row.get(name) is not None:
+                index.remove(row[name], row_id)
+            if value is not None:
+                index.add(value, row_id)
+            row[name] = value
+            is_changed = True
+        return is_changed
+
+    def _is_stale(self, ticker_key: TickerKey, now: float) -> bool:
+        fetched_at = self._fetched_at.get(ticker_key)
+        return fetched_at is not None and now - fetched_at > self.ttl
+
+    def _evict(self, ticker_key: TickerKey) -> None:
+        """Drop every row of one (ticker, period) and its index entries."""
+        period = ticker_key[1]
+        for row_id in self._ticker_rows.pop(ticker_key, []):
+            row = self.rows.pop(row_id)
+            del self._row_ids[(row["ticker"], period, row[REPORT_PERIOD])]
+            for name, value in row.items():
+                if name in ("ticker", "period") or value is None:
+                    continue
+                self._indexes[(period, name)].remove(value.toordinal() if name == REPORT_PERIOD else value, row_id)
+        self._coverage.pop(ticker_key, None)
+        self._fetched_at.pop(ticker_key, None)
+
+    def _index(self, period: str, field: str) -> SortedIndex:
+        index = self._indexes.get((period, field))
+        if index is None:
+            index = self._indexes[(period, field)] = SortedIndex()
+        return index
+
+    def index(self, period: str, field: str) -> Optional[SortedIndex]:
+        return self._indexes.get((period, field))
+
+    def has_statements(self, ticker: str, period: str, kinds: Iterable[str], periods: int = 1) -> bool:
+        """Whether fresh statements of every kind are held ``periods`` report periods deep.
+
+        Stale statements are dropped so they get refetched.
+        """
+        ticker_key = (ticker, period)
+        with self.lock:
+            if self._is_stale(ticker_key, time.time()):
+                self._evict(ticker_key)
+                return False
+            if ticker_key in self._fetched_at:
+                self._fetched_at.move_to_end(ticker_key)
+            coverage = self._coverage.get(ticker_key, {})
+            return all(coverage.get(kind, 0) >= periods for kind in kinds)
+
+    def fetched_at(self, ticker: str, period: str) -> Optional[float]:
+        """Wall time the ticker's statements for ``period`` were last fetched, if held."""
+        return self._fetched_at.get((ticker, period))
+
+    def rows_for(self, ticker: str, period: str) -> List[Dict[str, object]]:
+        """Rows for one ticker and period, oldest report period first."""
+        with self.lock:
+            rows = [self.rows[row_id] for row_id in self._ticker_rows.get((ticker, period), [])]
+        return sorted(rows, key=lambda row: row[REPORT_PERIOD])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.rows.clear()
+            self._row_ids.clear()
+            self._indexes.clear()
+            self._coverage.clear()
+            self._ticker_rows.clear()
+            self._fetched_at.clear()
+
+
+statement_store = StatementStore()
@@ -0,0 +1,310 @@
+"""Offline throughput and latency benchmarks for the AI Fund API.
+
+Starts the stub upstream (``benchmarks.stub_server``) and the app under
+uvicorn in subprocesses, drives the HTTP routes at several concurrency
+levels, runs ``FinancialMetrics`` micro-benchmarks, and writes everything to
+a JSON file so runs can be compared::
+
+    python -m benchmarks.run --output bench_results.json
+    python -m benchmarks.run --compare bench_results.json --output new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from app.agents.financial_metrics import FinancialMetrics
+from app.schemas.sensitivity import SensitivityPayload
+from app.services import screener, sensitivity
+from app.services.statement_store import StatementStore
+from benchmarks.stub_server import statement
+from models import BalanceSheetModel, CashFlowStatementModel, FinancialSearchPayload, FinancialsModel, IncomeStatementModel
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS: Dict[str, str] = {
+    "metrics_grouped": "/metrics/grouped/{ticker}?limit=4&stock_price=150&cost_of_equity=0.08",
+    "income_statements": "/financials/financials/income-statements/{ticker}?limit=4",
+    "balance_sheets": "/financials/financials/balance-sheets/{ticker}?limit=4",
+    "cash_flow_statements": "/financials/financials/cash-flow-statements/{ticker}?limit=4",
+    "all_financials": "/financials/financials/{ticker}?limit=4",
+    "prices": "/prices/prices/{ticker}?limit=30",
+    "price_snapshot": "/prices/prices/snapshot/{ticker}",
+}
+
+TICKERS = [f"T{index:03d}" for index in range(50)]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def start_process(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT), **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def drive(base_url: str, path: str, concurrency: int, requests_per_worker: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(client: httpx.AsyncClient, offset: int) -> None:
+        nonlocal errors
+        for index in range(requests_per_worker):
+            ticker = TICKERS[(offset + index) % len(TICKERS)]
+            start = time.perf_counter()
+            response = await client.get(path.format(ticker=ticker))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await client.get(path.format(ticker=TICKERS[0]))  # warm-up
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def run_http(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    stub_port, app_port = free_port(), free_port()
+    stub_args = ["-m", "benchmarks.stub_server", "--port", str(stub_port), "--latency-ms", str(args.latency_ms)]
+    if args.rows is not None:
+        stub_args += ["--rows", str(args.rows)]
+    stub = start_process(stub_args, {})
+    server = start_process(
+        ["-m", "uvicorn", "app.main:app", "--port", str(app_port), "--workers", str(args.workers), "--log-level", "warning"],
+        {"FINANCIAL_DATASETS_BASE_URL": f"http://127.0.0.1:{stub_port}", "LOG_LEVEL": "WARNING"},
+    )
+    base_url = f"http://127.0.0.1:{app_port}"
+    results = []
+    try:
+        wait_for(f"http://127.0.0.1:{stub_port}/prices/snapshot")
+        wait_for(f"{base_url}/internal/telemetry")
+        for name in args.scenarios:
+            for concurrency in args.concurrency:
+                outcome = asyncio.run(drive(base_url, SCENARIOS[name], concurrency, args.requests))
+                results.append({"scenario": name, "concurrency": concurrency, **outcome})
+                print(
+                    f"{name:<22} c={concurrency:<4} {outcome['requests_per_second']:9.1f} req/s "
+                    f"p50={outcome['p50_ms']:8.2f}ms p99={outcome['p99_ms']:8.2f}ms errors={outcome['errors']}",
+                    flush=True,
+                )
+    finally:
+        for process in (server, stub):
+            process.terminate()
+            process.wait(timeout=10)
+    return results
+
+
+def run_micro(period_counts: List[int]) -> List[Dict[str, Any]]:
+    """Time every ``FinancialMetrics`` category over ``n`` periods, as the grouped route does."""
+    metrics = FinancialMetrics()
+    templates = [
+        (
+            IncomeStatementModel(**statement("income_statements", "BENCH", "quarterly", index)),
+            BalanceSheetModel(**statement("balance_sheets", "BENCH", "quarterly", index)),
+            CashFlowStatementModel(**statement("cash_flow_statements", "BENCH", "quarterly", index)),
+        )
+        for index in range(64)
+    ]
+    results = []
+    for count in period_counts:
+        periods = [templates[index % len(templates)] for index in range(count)]
+        start = time.perf_counter()
+        for income_statement, balance_sheet, cash_flow_statement in periods:
+            metrics.calculate_liquidity_ratios(balance_sheet)
+            metrics.calculate_ebitda_ratios(income_statement, cash_flow_statement)
+            metrics.calculate_leverage_ratios(balance_sheet)
+            metrics.calculate_efficiency_ratios(income_statement, balance_sheet)
+            metrics.calculate_profitability_ratios(income_statement, balance_sheet)
+            metrics.calculate_dupont_ratios(income_statement, balance_sheet)
+            metrics.calculate_economic_value_ratios(income_statement, balance_sheet, 0.08)
+            metrics.calculate_stock_performance_ratios(income_statement, balance_sheet, cash_flow_statement, 150.0)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "benchmark": "financial_metrics_all_categories",
+            "periods": count,
+            "total_ms": elapsed * 1000,
+            "per_period_us": elapsed / count * 1e6,
+        })
+        print(f"FinancialMetrics periods={count:<7} total={elapsed * 1000:10.2f}ms per-period={elapsed / count * 1e6:8.2f}us", flush=True)
+    return results
+
+
+def run_screening(ticker_count: int, years: int, repeats: int = 20) -> List[Dict[str, Any]]:
+    """Time local ``FinancialSearchPayload`` screens over ``ticker_count`` x ``years`` statements."""
+    store = StatementStore()
+    for index in range(ticker_count):
+        ticker = f"S{index:05d}"
+        store.record(IncomeStatementModel(**statement("income_statements", ticker, "annual", year)) for year in range(years))
+        store.record(BalanceSheetModel(**statement("balance_sheets", ticker, "annual", year)) for year in range(years))
+
+    screens = {
+        "single_range": [{"field": "revenue", "operator": "gt", "value": 4e10}],
+        "three_filters": [
+            {"field": "revenue", "operator": "gt", "value": 1e10},
+            {"field": "net_income", "operator": "gte", "value": 5e9},
+            {"field": "total_assets", "operator": "lt", "value": 3e10},
+        ],
+        "no_filters_desc": [],
+    }
+    results = []
+    for name, filters in screens.items():
+        payload = FinancialSearchPayload(filters=filters, limit=100, order="desc")
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            screener.screen(payload, store)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results.append({
+            "benchmark": f"screen_{name}",
+            "rows": ticker_count * years,
+            "p50_ms": percentile(timings, 0.50) * 1000,
+            "p99_ms": percentile(timings, 0.99) * 1000,
+        })
+        print(f"screen {name:<16} rows={ticker_count * years:<7} p50={results[-1]['p50_ms']:7.2f}ms p99={results[-1]['p99_ms']:7.2f}ms", flush=True)
+    return results
+
+
+def run_sensitivity(periods: int = 10, grid: int = 100, repeats: int = 20) -> List[Dict[str, Any]]:
+    """Time a ``grid`` x ``grid`` stock price / cost of equity sweep over ``periods`` statements."""
+    financials = FinancialsModel(**{
+        kind: [statement(kind, "BENCH", "annual", index) for index in range(periods)]
+        for kind in ("income_statements", "balance_sheets", "cash_flow_statements")
+    })
+    payload = SensitivityPayload(
+        stock_price={"start": 50, "stop": 250, "num": grid},
+        cost_of_equity={"start": 0.04, "stop": 0.14, "num": grid},
+        limit=periods,
+    )
+    names, _ = sensitivity.resolve_metrics(None)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sensitivity.build_sensitivity("BENCH", financials, payload, names)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    result = {
+        "benchmark": f"sensitivity_{grid}x{grid}",
+        "periods": periods,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+    }
+    print(f"sensitivity {grid}x{grid} periods={periods:<4} p50={result['p50_ms']:7.2f}ms p99={result['p99_ms']:7.2f}ms", flush=True)
+    return [result]
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """Print the relative change of each matching HTTP and micro-benchmark result."""
+    before = {(row["scenario"], row["concurrency"]): row for row in previous.get("http", [])}
+    for row in current.get("http", []):
+        old = before.get((row["scenario"], row["concurrency"]))
+        if old and old["requests_per_second"]:
+            change = (row["requests_per_second"] / old["requests_per_second"] - 1) * 100
+            print(f"{row['scenario']:<22} c={row['concurrency']:<4} req/s {change:+7.1f}%  p99 {old['p99_ms']:.2f}ms -> {row['p99_ms']:.2f}ms")
+    before_micro = {micro_key(row): row for row in previous.get("micro", [])}
+    for row in current.get("micro", []):
+        old = before_micro.get(micro_key(row))
+        timing = "total_ms" if "total_ms" in row else "p50_ms"
+        if old and old.get(timing):
+            change = (row[timing] / old[timing] - 1) * 100
+            print(f"{row['benchmark']:<34} size={micro_key(row)[1]:<7} {timing} {change:+7.1f}%")
+
+
+def micro_key(row: Dict[str, Any]) -> tuple:
+    return row["benchmark"], row.get("periods", row.get("rows"))
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", default=None, help="Previous results file to diff against")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=50, help="Requests issued by each concurrent client")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Stub upstream latency")
+    parser.add_argument("--rows", type=int, default=None, help="Stub upstream rows per payload")
+    parser.add_argument("--periods", nargs="+", type=int, default=[1, 10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--screen-tickers", type=int, default=3_000)
+    parser.add_argument("--screen-years", type=int, default=5)
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "http": [] if args.skip_http else run_http(args),
+        "micro": [] if args.skip_micro else (
+            run_micro(args.periods) + run_screening(args.screen_tickers, args.screen_years) + run_sensitivity()
+        ),
+    }
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Import-time and memory budget for ``app.main``.
+
+Imports the application in fresh interpreters, reports the median import
+time, resident memory and number of loaded modules, and lists any
+heavyweight packages (ML, agent and dataframe stacks) that were loaded.
+Exits non-zero when a budget is exceeded or a heavy package is imported at
+startup::
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --max-import-ms 400 --max-rss-mb 56 --output startup.json
+
+Import time depends on the machine; the module count and resident memory
+do not, so ``tests/test_startup.py`` checks those two on every run.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Only needed by the agent, the ML tooling or on-demand routes; never at startup
+HEAVY_MODULES = (
+    "langchain",
+    "langchain_openai",
+    "openai",
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "sklearn",
+    "matplotlib",
+    "pandas",
+    "pyarrow",
+    "numpy",
+)
+
+# app.main imports in about 350ms into a 48MB resident set with ~520 modules loaded;
+# pulling in NumPy alone adds ~110 modules and 15MB, tripping both budgets
+MAX_IMPORT_MS = float(os.getenv("STARTUP_MAX_IMPORT_MS", "500"))
+MAX_RSS_MB = float(os.getenv("STARTUP_MAX_RSS_MB", "60"))
+MAX_MODULES = int(os.getenv("STARTUP_MAX_MODULES", "600"))
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+if sys.platform == "linux":
+    # ru_maxrss survives exec and would report the launching process's peak; VmHWM is this image's own
+    with open("/proc/self/status") as status:
+        rss_bytes = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:")) * 1024
+else:
+    # macOS reports ru_maxrss in bytes
+    rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = sorted({name.split(".")[0] for name in sys.modules} & set(%r))
+print(json.dumps({"import_seconds": elapsed, "rss_bytes": rss_bytes, "modules": len(sys.modules), "heavy_modules": heavy}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_once() -> Dict[str, Any]:
+    """Import ``app.main`` in a new interpreter and report what it cost."""
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int) -> Dict[str, Any]:
+    # The first import compiles bytecode; it is not what a restarted worker pays
+    measure_once()
+    samples = [measure_once() for _ in range(runs)]
+    return {
+        "runs": runs,
+        "import_ms_p50": statistics.median(sample["import_seconds"] for sample in samples) * 1000,
+        "rss_mb_p50": statistics.median(sample["rss_bytes"] for sample in samples) / 2**20,
+        "modules": max(sample["modules"] for sample in samples),
+        "heavy_modules": sorted({name for sample in samples for name in sample["heavy_modules"]}),
+    }
+
+
+def check(result: Dict[str, Any], max_import_ms: float, max_rss_mb: float, max_modules: int = MAX_MODULES) -> List[str]:
+    failures = []
+    if result["import_ms_p50"] > max_import_ms:
+        failures.append(f"import took {result['import_ms_p50']:.0f}ms, budget {max_import_ms:.0f}ms")
+    if result["rss_mb_p50"] > max_rss_mb:
+        failures.append(f"resident memory {result['rss_mb_p50']:.1f}MB, budget {max_rss_mb:.0f}MB")
+    if result["modules"] > max_modules:
+        failures.append(f"{result['modules']} modules loaded, budget {max_modules}")
+    if result["heavy_modules"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(result['heavy_modules'])}")
+    return failures
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=MAX_IMPORT_MS)
+    parser.add_argument("--max-rss-mb", type=float, default=MAX_RSS_MB)
+    parser.add_argument("--max-modules", type=int, default=MAX_MODULES)
+    parser.add_argument("--output", default=None, help="Where to write the JSON result")
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs)
+    failures = check(result, args.max_import_ms, args.max_rss_mb, args.max_modules)
+    result.update(
+        budget={"import_ms": args.max_import_ms, "rss_mb": args.max_rss_mb, "modules": args.max_modules},
+        failures=failures,
+    )
+    print(
+        f"app.main import p50 {result['import_ms_p50']:.0f}ms, rss p50 {result['rss_mb_p50']:.1f}MB, "
+        f"{result['modules']} modules"
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
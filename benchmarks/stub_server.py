@@ -0,0 +1,313 @@
+"""Offline stand-in for the financialdatasets.ai API.
+
+Serves deterministic synthetic payloads (the same ticker and query always
+produce the same body, with an ETag honoured on revalidation) with
+configurable latency and payload size, so the
+app can be benchmarked without network access or an API key::
+
+    python -m benchmarks.stub_server --port 8900 --latency-ms 20 --rows 40
+
+Point the app at it with ``FINANCIAL_DATASETS_BASE_URL=http://127.0.0.1:8900``.
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from models import BalanceSheetModel, CashFlowStatementModel, IncomeStatementModel
+
+STATEMENT_MODELS = {
+    "income_statements": IncomeStatementModel,
+    "balance_sheets": BalanceSheetModel,
+    "cash_flow_statements": CashFlowStatementModel,
+}
+
+SEGMENT_AXES = {
+    "srt:ProductOrServiceAxis": ["iPhone", "Mac", "iPad", "Services", "Wearables"],
+    "us-gaap:StatementBusinessSegmentsAxis": ["Americas", "Europe", "China", "Japan", "RestOfAsiaPacific"],
+}
+
+
+class StubConfig:
+    """Knobs shared by every request handler."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rows: int | None = None
+    max_rows: int = 100_000
+
+
+def report_period(period: str, index: int) -> date:
+    """Most recent period first, matching upstream ordering."""
+    if period == "quarterly":
+        year, quarter = divmod(2024 * 4 + 3 - index, 4)
+        month = quarter * 3 + 3
+        return date(year, month, 30 if month in (6, 9) else 31)
+    return date(2024 - index, 12, 31)
+
+
+def statement(kind: str, ticker: str, period: str, index: int) -> Dict[str, Any]:
+    rng = random.Random(f"{ticker}:{kind}:{period}:{index}")
+    scale = random.Random(ticker).uniform(1e8, 1e11) * (0.25 if period == "quarterly" else 1.0)
+    scale *= 0.95 ** index
+    reported = report_period(period, index)
+    row: Dict[str, Any] = {
+        "ticker": ticker,
+        "calendar_date": reported.isoformat(),
+        "report_period": reported.isoformat(),
+        "period": period,
+        "currency": "USD",
+    }
+    for field in STATEMENT_MODELS[kind].model_fields:
+        if field in row:
+            continue
+        row[field] = round(scale * rng.uniform(0.05, 1.0), 2)
+    if kind == "balance_sheets":
+        row["outstanding_shares"] = round(scale / rng.uniform(20, 400))
+    if kind == "income_statements":
+        row["weighted_average_shares"] = round(scale / rng.uniform(20, 400))
+        row["earnings_per_share"] = round(rng.uniform(-2, 12), 2)
+    return row
+
+
+def row_count(query: Dict[str, str], default: int) -> int:
+    if StubConfig.rows is not None:
+        return StubConfig.rows
+    return min(int(query.get("limit", default)), StubConfig.max_rows)
+
+
+def statements_payload(kind: str) -> Callable[[Dict[str, str], Any], Dict[str, Any]]:
+    def build(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+        ticker, period = query.get("ticker", "AAPL"), query.get("period", "annual")
+        return {kind: [statement(kind, ticker, period, i) for i in range(row_count(query, 4))]}
+    return build
+
+
+def all_financials(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    return {"financials": {kind: statements_payload(kind)(query, body)[kind] for kind in STATEMENT_MODELS}}
+
+
+def segmented(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    ticker, period = query.get("ticker", "AAPL"), query.get("period", "annual")
+    results = []
+    for index in range(row_count(query, 5)):
+        rng = random.Random(f"{ticker}:segmented:{period}:{index}")
+        reported = report_period(period, index).isoformat()
+        items = [
+            {"axis": axis, "key": key, "value": round(rng.uniform(1e8, 5e10), 2), "period": reported}
+            for axis, keys in SEGMENT_AXES.items()
+            for key in keys
+        ]
+        results.append({"ticker": ticker, "report_period": reported, "period": period, "items": items})
+    return {"segmented_financials": results}
+
+
+def financial_search(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    body = body or {}
+    period = body.get("period", "annual")
+    rng = random.Random(json.dumps(body, sort_keys=True))
+    count = StubConfig.rows if StubConfig.rows is not None else int(body.get("limit", 50))
+    return {
+        "search_results": [
+            {"ticker": f"T{rng.randrange(10_000):04d}", "report_period": report_period(period, 0).isoformat(), "period": period}
+            for _ in range(count)
+        ]
+    }
+
+
+def line_item_search(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    body = body or {}
+    period = body.get("period", "annual")
+    results = []
+    for ticker in body.get("tickers", []):
+        for index in range(int(body.get("limit", 2))):
+            rng = random.Random(f"{ticker}:line-items:{period}:{index}")
+            row = {"ticker": ticker, "report_period": report_period(period, index).isoformat(), "period": period}
+            for line_item in body.get("line_items", []):
+                row[line_item] = round(rng.uniform(1e6, 1e11), 2)
+            results.append(row)
+    return {"search_results": results}
+
+
+def prices(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    ticker = query.get("ticker", "AAPL")
+    rng = random.Random(f"{ticker}:prices")
+    close = rng.uniform(10, 500)
+    rows = []
+    for index in range(row_count(query, 5)):
+        close *= rng.uniform(0.97, 1.03)
+        rows.append({
+            "open": round(close * rng.uniform(0.99, 1.01), 2),
+            "close": round(close, 2),
+            "high": round(close * 1.02, 2),
+            "low": round(close * 0.98, 2),
+            "volume": rng.randrange(1_000_000, 90_000_000),
+            "time": (date(2024, 12, 31) - timedelta(days=index)).isoformat(),
+        })
+    return {"prices": rows}
+
+
+def price_snapshot(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    ticker = query.get("ticker", "AAPL")
+    rng = random.Random(f"{ticker}:snapshot")
+    price = round(rng.uniform(10, 500), 2)
+    return {"snapshot": {"ticker": ticker, "price": price, "day_change": round(rng.uniform(-5, 5), 2), "time": "2024-12-31T21:00:00Z"}}
+
+
+def company_facts(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    ticker = query.get("ticker", "AAPL")
+    rng = random.Random(f"{ticker}:facts")
+    return {
+        "company_facts": {
+            "ticker": ticker,
+            "name": f"{ticker} Holdings Inc.",
+            "cik": f"{rng.randrange(10**9):010d}",
+            "market_cap": round(rng.uniform(1e9, 3e12), 2),
+            "sector": rng.choice(["Technology", "Healthcare", "Industrials", "Energy"]),
+            "is_active": True,
+        }
+    }
+
+
+def filings(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    ticker = query.get("ticker", "AAPL")
+    return {
+        "filings": [
+            {
+                "ticker": ticker,
+                "filing_type": "10-K" if index % 4 == 0 else "10-Q",
+                "report_date": report_period("quarterly", index).isoformat(),
+                "url": f"https://www.sec.gov/Archives/edgar/data/{ticker}/{index}.htm",
+            }
+            for index in range(row_count(query, 5))
+        ]
+    }
+
+
+def insider_transactions(query: Dict[str, str], body: Any) -> Dict[str, Any]:
+    ticker = query.get("ticker", "AAPL")
+    filed_since = query.get("filing_date_gte")
+    rows = []
+    for index in range(row_count(query, 5)):
+        rng = random.Random(f"{ticker}:insider:{index}")
+        shares = rng.randrange(-50_000, 50_000)
+        price = round(rng.uniform(10, 500), 2)
+        # Anchored to today so rolling insider windows always have activity
+        traded = date.today() - timedelta(days=index * 3 + 2)
+        rows.append({
+            "ticker": ticker,
+            "issuer": f"{ticker} Holdings Inc.",
+            "name": f"Insider {rng.randrange(12)}",
+            "title": rng.choice(["CEO", "CFO", "Director", "COO"]),
+            "is_board_director": rng.random() < 0.4,
+            "transaction_date": traded.isoformat(),
+            "transaction_shares": shares,
+            "transaction_price_per_share": price,
+            "transaction_value": round(abs(shares) * price, 2),
+            "shares_owned_before_transaction": 1_000_000,
+            "shares_owned_after_transaction": 1_000_000 + shares,
+            "security_title": "Common Stock",
+            "filing_date": (traded + timedelta(days=2)).isoformat(),
+        })
+    if filed_since:
+        rows = [row for row in rows if row["filing_date"] >= filed_since]
+    if query.get("filing_date_lte"):
+        rows = [row for row in rows if row["filing_date"] <= query["filing_date_lte"]]
+    return {"insider_transactions": rows}
+
+
+ROUTES: Dict[str, Callable[[Dict[str, str], Any], Dict[str, Any]]] = {
+    "/financials/income-statements": statements_payload("income_statements"),
+    "/financials/balance-sheets": statements_payload("balance_sheets"),
+    "/financials/cash-flow-statements": statements_payload("cash_flow_statements"),
+    "/financials/segmented": segmented,
+    "/financials": all_financials,
+    "/financials/search": financial_search,
+    "/financials/search/line-items": line_item_search,
+    "/prices": prices,
+    "/prices/snapshot": price_snapshot,
+    "/company/facts": company_facts,
+    "/filings": filings,
+    "/insider-transactions": insider_transactions,
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._respond(None)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._respond(json.loads(self.rfile.read(length) or b"{}"))
+
+    def _respond(self, body: Any) -> None:
+        parsed = urlparse(self.path)
+        builder = ROUTES.get(parsed.path.rstrip("/") or "/")
+        if builder is None:
+            self._send(404, {"error": f"Unknown route {parsed.path}"})
+            return
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        delay = StubConfig.latency_ms + random.uniform(0, StubConfig.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        self._send(200, builder(query, body))
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        content = json.dumps(payload).encode()
+        etag = f'"{hashlib.md5(content).hexdigest()}"'
+        if status == 200 and self.command == "GET" and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8900) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random delay added on top of --latency-ms")
+    parser.add_argument("--rows", type=int, default=None, help="Rows per payload, overriding the request's limit")
+    args = parser.parse_args(argv)
+
+    StubConfig.latency_ms = args.latency_ms
+    StubConfig.jitter_ms = args.jitter_ms
+    StubConfig.rows = args.rows
+
+    server = serve(args.host, args.port)
+    print(f"Stub financialdatasets.ai listening on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -6,9 +7,68 @@ load_dotenv()
 
 # API Key and Base URL for financialdatasets.ai
 FINANCIAL_DATASETS_API_KEY = os.getenv('FINANCIAL_DATASETS_API_KEY')
-BASE_URL = "https://api.financialdatasets.ai"
+BASE_URL = os.getenv('FINANCIAL_DATASETS_BASE_URL', "https://api.financialdatasets.ai")
 
 # Headers to be used in all requests
 HEADERS = {
     "X-API-KEY": FINANCIAL_DATASETS_API_KEY
 }
+
+# Logging level for the structured JSON logs emitted under the ``app`` logger
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+# Folded into every ETag and the metrics cache keys; set it (e.g. to the git SHA) when deploying.
+# Empty means a digest of the application source, which changes with any code change
+APP_VERSION = os.getenv('APP_VERSION', '')
+
+# Upstream fan-out: maximum concurrent requests and tickers per line-items request
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv('UPSTREAM_MAX_CONCURRENCY', '8'))
+LINE_ITEMS_CHUNK_SIZE = int(os.getenv('LINE_ITEMS_CHUNK_SIZE', '25'))
+
+# Line-item cells are cached per (ticker, line_item, period)
+LINE_ITEMS_CACHE_TTL = float(os.getenv('LINE_ITEMS_CACHE_TTL', '3600'))
+LINE_ITEMS_CACHE_MAX_ENTRIES = int(os.getenv('LINE_ITEMS_CACHE_MAX_ENTRIES', '200000'))
+
+# Report periods fetched per ticker when a local screen needs statements it does not hold
+SCREEN_HISTORY_LIMIT = int(os.getenv('SCREEN_HISTORY_LIMIT', '5'))
+# Statement store bounds: (ticker, period) pairs held, and seconds before they are refetched
+STATEMENT_STORE_MAX_TICKERS = int(os.getenv('STATEMENT_STORE_MAX_TICKERS', '5000'))
+STATEMENT_STORE_TTL = float(os.getenv('STATEMENT_STORE_TTL', '86400'))
+
+# Named peer groups for /metrics/rank, overridable with a JSON object in PEER_GROUPS
+PEER_GROUPS = json.loads(os.getenv('PEER_GROUPS', 'null')) or {
+    "megacap_tech": ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA"],
+    "semiconductors": ["NVDA", "AMD", "INTC", "AVGO", "QCOM", "TXN", "MU"],
+    "banks": ["JPM", "BAC", "WFC", "C", "GS", "MS"],
+}
+# Ad-hoc ticker universes whose rank indexes are kept warm
+RANK_INDEX_MAX_UNIVERSES = int(os.getenv('RANK_INDEX_MAX_UNIVERSES', '64'))
+
+# Pivoted segmented financials are cached per (ticker, period, limit)
+SEGMENT_PIVOT_CACHE_TTL = float(os.getenv('SEGMENT_PIVOT_CACHE_TTL', '3600'))
+SEGMENT_PIVOT_CACHE_MAX_ENTRIES = int(os.getenv('SEGMENT_PIVOT_CACHE_MAX_ENTRIES', '2048'))
+
+# Insider transactions: first sync pulls INSIDER_BACKFILL_LIMIT rows, later syncs only newer filings
+INSIDER_BACKFILL_LIMIT = int(os.getenv('INSIDER_BACKFILL_LIMIT', '1000'))
+INSIDER_SYNC_LIMIT = int(os.getenv('INSIDER_SYNC_LIMIT', '200'))
+INSIDER_SYNC_INTERVAL = float(os.getenv('INSIDER_SYNC_INTERVAL', '300'))
+INSIDER_WINDOWS = (30, 90, 365)
+
+# Upstream responses kept for conditional revalidation (ETag / Last-Modified) and parse reuse
+UPSTREAM_CACHE_TTL = float(os.getenv('UPSTREAM_CACHE_TTL', '86400'))
+UPSTREAM_CACHE_MAX_ENTRIES = int(os.getenv('UPSTREAM_CACHE_MAX_ENTRIES', '4096'))
+# Upstream responses younger than this many seconds are served without revalidating
+UPSTREAM_FRESH_TTL = float(os.getenv('UPSTREAM_FRESH_TTL', '0'))
+# Seconds to wait for upstream to connect and for each read; callers queued on a URL wait no longer
+UPSTREAM_TIMEOUT = float(os.getenv('UPSTREAM_TIMEOUT', '30'))
+
+# Serialized /metrics/grouped responses, keyed by the ETag of the statements they were computed from
+METRICS_CACHE_TTL = float(os.getenv('METRICS_CACHE_TTL', '3600'))
+METRICS_CACHE_MAX_ENTRIES = int(os.getenv('METRICS_CACHE_MAX_ENTRIES', '4096'))
+
+# Backend for the upstream response and metrics caches: "memory" keeps them per process,
+# "file" stores them under CACHE_DIR so every worker on the host shares them. Entries are
+# pickled, so the directory must be private to the user running the service (see FileCache)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'ai-fund'))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
@@ -7,6 +7,7 @@ class FinancialSearchPayload(BaseModel):
     limit: int = 50
     filters: List[dict]
     order: str = "asc"
+    tickers: Optional[List[str]] = None  # Screen these locally instead of the whole upstream universe
 
 class LineItemsPayload(BaseModel):
     line_items: List[str]
@@ -136,13 +137,35 @@ class FinancialSearchResponse(BaseModel):
     search_results: List[SearchResultModel]
     
 class LineItemSearchResultModel(BaseModel):
+    """Requested line items come back as extra fields named after the line item"""
     ticker: str
     report_period: date
     period: str
 
+    class Config:
+        extra = "allow"
+
 class LineItemSearchResponse(BaseModel):
     search_results: List[LineItemSearchResultModel]
 
+class InsiderTransactionModel(BaseModel):
+    ticker: str
+    issuer: Optional[str] = None
+    name: Optional[str] = None
+    title: Optional[str] = None
+    is_board_director: Optional[bool] = None
+    transaction_date: Optional[date] = None
+    transaction_shares: Optional[float] = None
+    transaction_price_per_share: Optional[float] = None
+    transaction_value: Optional[float] = None
+    shares_owned_before_transaction: Optional[float] = None
+    shares_owned_after_transaction: Optional[float] = None
+    security_title: Optional[str] = None
+    filing_date: date
+
+class InsiderTransactionsResponse(BaseModel):
+    insider_transactions: List[InsiderTransactionModel]
+
 class RatioResponse(BaseModel):
     ticker: str
     ratio_name: str
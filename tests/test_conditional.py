@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import conditional, upstream
+from app.main import app
+
+FACTS_URL = "https://api.financialdatasets.ai/company/facts?ticker=AAPL"
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, etag=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = {"ETag": etag} if etag else {}
+        self.text = self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    """Upstream serving company facts with an ETag and honouring If-None-Match."""
+    state = {"body": {"company_facts": {"ticker": "AAPL", "name": "Apple"}}, "etag": '"v1"', "sent": []}
+
+    def fake_get(url, headers=None, timeout=None):
+        state["sent"].append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == state["etag"]:
+            return FakeResponse(304)
+        return FakeResponse(200, state["body"], state["etag"])
+
+    upstream.responses.clear()
+    upstream.validated_models.clear()
+    monkeypatch.setattr(upstream.session, "get", fake_get)
+    return state
+
+
+def test_upstream_revalidation_reuses_decoded_payload(fake_upstream):
+    first = upstream.fetch("company_facts", FACTS_URL, "error")
+    second = upstream.fetch("company_facts", FACTS_URL, "error")
+
+    assert fake_upstream["sent"][1]["If-None-Match"] == '"v1"'
+    assert second.data is first.data
+
+    # A new validator with an identical body is still recognised by its digest
+    fake_upstream["etag"] = '"v2"'
+    third = upstream.fetch("company_facts", FACTS_URL, "error")
+    assert third.data is first.data
+
+
+def test_matching_if_none_match_returns_304(fake_upstream):
+    client = TestClient(app)
+    response = client.get("/company/company/facts/AAPL")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+
+    repeat = client.get("/company/company/facts/AAPL", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["etag"] == etag
+    assert repeat.content == b""
+
+    fake_upstream["body"] = {"company_facts": {"ticker": "AAPL", "name": "Apple Inc."}}
+    fake_upstream["etag"] = '"v2"'
+    changed = client.get("/company/company/facts/AAPL", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_routes_without_upstream_data_get_body_etags():
+    client = TestClient(app)
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert client.get("/openapi.json", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_body_etag_304_keeps_cors_headers():
+    client = TestClient(app)
+    origin = {"Origin": "http://localhost:3000"}
+    response = client.get("/openapi.json", headers=origin)
+
+    repeat = client.get("/openapi.json", headers={**origin, "If-None-Match": response.headers["etag"]})
+    assert repeat.status_code == 304
+    assert repeat.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert repeat.headers["access-control-expose-headers"] == "ETag"
+    assert "content-length" not in repeat.headers and "content-type" not in repeat.headers
+
+
+def test_new_code_version_invalidates_etags(fake_upstream, monkeypatch):
+    client = TestClient(app)
+    etag = client.get("/company/company/facts/AAPL").headers["etag"]
+
+    # Same upstream data, but a deploy may have changed how the response is built
+    monkeypatch.setattr(conditional, "CODE_VERSION", "next-release")
+    response = client.get("/company/company/facts/AAPL", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,96 @@
+import argparse
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import HTTPException
+
+from app.agents.financial_metrics import FinancialMetrics
+from app.core import upstream
+from app.export import read_tickers
+from app.services import bulk_export
+from benchmarks.stub_server import serve, statement
+from models import FinancialsModel
+
+
+def fake_financials(ticker, period, limit):
+    if ticker == "FAIL":
+        raise HTTPException(status_code=404, detail="Error fetching financials")
+    return FinancialsModel(**{
+        kind: [statement(kind, ticker, period, i) for i in range(limit)]
+        for kind in ("income_statements", "balance_sheets", "cash_flow_statements")
+    })
+
+
+def test_export_writes_one_row_group_per_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_export, "fetch_financials", fake_financials)
+    path = str(tmp_path / "universe.parquet")
+    summary = bulk_export.export_universe(["AAPL", "MSFT", "FAIL", "NVDA", "AAPL"], path, limit=3, chunk_size=2)
+
+    assert (summary.rows, summary.tickers, summary.failed) == (9, 3, ["FAIL"])
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.column("ticker").to_pylist() == ["AAPL"] * 3 + ["MSFT"] * 3 + ["NVDA"] * 3
+
+    financials = fake_financials("MSFT", "annual", 3)
+    income, balance = financials.income_statements[-1], financials.balance_sheets[-1]
+    row = table.slice(3, 1).to_pylist()[0]
+    assert row["report_period"] == income.report_period
+    assert row["revenue"] == income.revenue
+    assert row["liquidity.current_ratio"] == pytest.approx(FinancialMetrics().calculate_liquidity_ratios(balance)["current_ratio"])
+    assert "stock_performance.earnings_per_share" in table.column_names
+    assert "stock_performance.price_to_earnings_ratio" not in table.column_names
+    assert "economic_value.economic_margin" not in table.column_names
+
+
+def test_quarterly_export_adds_growth_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_export, "fetch_financials", fake_financials)
+    path = str(tmp_path / "universe.arrow")
+    bulk_export.export_universe(["AAPL"], path, period="quarterly", limit=8, format="arrow")
+
+    table = pa.ipc.open_file(path).read_all()
+    yoy = table.column("growth.revenue_yoy").to_pylist()
+    assert yoy[:4] == [None] * 4 and None not in yoy[4:]
+
+
+@pytest.fixture
+def stub_upstream(monkeypatch):
+    server = serve(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    # Spawned workers read the upstream URL from the environment
+    monkeypatch.setenv("FINANCIAL_DATASETS_BASE_URL", base_url)
+    monkeypatch.setattr(bulk_export, "BASE_URL", base_url)
+    yield base_url
+    server.shutdown()
+
+
+def test_process_pool_export_against_stub_upstream(tmp_path, stub_upstream):
+    path = str(tmp_path / "universe.parquet")
+    tickers = [f"T{i:03d}" for i in range(12)]
+    summary = bulk_export.export_universe(tickers, path, limit=2, workers=2, chunk_size=3)
+
+    assert (summary.rows, summary.row_groups, summary.failed) == (24, 4, [])
+    assert pq.read_table(path, columns=["ticker"]).column("ticker").to_pylist()[::2] == tickers
+
+
+def test_export_fetches_bypass_the_upstream_caches(tmp_path, stub_upstream):
+    upstream.responses.clear()
+    upstream.validated_models.clear()
+    summary = bulk_export.export_universe(["AAPL", "MSFT"], str(tmp_path / "universe.parquet"), limit=2)
+
+    assert summary.rows == 4
+    assert len(upstream.responses) == 0
+    assert len(upstream.validated_models) == 0
+
+
+def test_read_tickers_normalises_and_deduplicates_every_source(tmp_path):
+    tickers_file = tmp_path / "tickers.txt"
+    tickers_file.write_text("msft\n aapl \nNVDA\n")
+    args = argparse.Namespace(tickers=["aapl", " Intc"], tickers_file=str(tickers_file), peer_group="semiconductors")
+
+    tickers = read_tickers(args)
+    assert tickers[:4] == ["AAPL", "INTC", "MSFT", "NVDA"]
+    assert len(tickers) == len(set(tickers))
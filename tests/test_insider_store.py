@@ -0,0 +1,144 @@
+from datetime import date, timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import HTTPException
+
+from app.endpoints.financial_datasets import insider_transactions
+from app.services.insider_store import InsiderStore
+from models import InsiderTransactionModel
+
+TODAY = date(2024, 12, 31)
+
+
+def transaction(ticker: str, days_ago: int, shares: float, price: float = 10.0, name: str = "Jane Doe"):
+    traded = TODAY - timedelta(days=days_ago)
+    return InsiderTransactionModel(
+        ticker=ticker, name=name, transaction_date=traded, transaction_shares=shares,
+        transaction_price_per_share=price, transaction_value=abs(shares) * price,
+        filing_date=traded + timedelta(days=2),
+    )
+
+
+def windows(store: InsiderStore, ticker: str, today: date = TODAY):
+    return {window.window_days: window for window in store.aggregates(ticker, today=today)}
+
+
+def test_rolling_windows_split_buys_and_sells():
+    store = InsiderStore()
+    store.record("AAPL", [
+        transaction("AAPL", 5, 100),
+        transaction("AAPL", 40, -30, name="John Roe"),
+        transaction("AAPL", 200, 50, name="Ann Poe"),
+        transaction("AAPL", 400, 999),
+    ], today=TODAY)
+
+    result = windows(store, "AAPL")
+    assert (result[30].net_shares, result[30].net_value, result[30].distinct_insiders) == (100, 1000, 1)
+    assert (result[90].shares_bought, result[90].shares_sold, result[90].net_value) == (100, -30, 700)
+    assert (result[365].transactions, result[365].distinct_insiders) == (3, 3)
+
+
+def test_duplicates_are_ignored_and_cursor_advances():
+    store = InsiderStore()
+    batch = [transaction("AAPL", 10, 100), transaction("AAPL", 3, -20)]
+    assert store.record("AAPL", batch, today=TODAY) == 2
+    assert store.record("AAPL", batch + [transaction("AAPL", 1, 5)], today=TODAY) == 1
+
+    assert store.cursor("AAPL") == TODAY + timedelta(days=1)
+    assert windows(store, "AAPL")[30].transactions == 3
+
+
+def test_windows_expire_as_time_passes():
+    store = InsiderStore()
+    store.record("AAPL", [transaction("AAPL", 20, 100), transaction("AAPL", 1, 10)], today=TODAY)
+    # Arrives out of order, after the newer trade
+    store.record("AAPL", [transaction("AAPL", 25, -40)], today=TODAY)
+
+    later = windows(store, "AAPL", today=TODAY + timedelta(days=15))
+    assert (later[30].net_shares, later[30].transactions) == (10, 1)
+    assert later[90].net_shares == 70
+    assert windows(store, "AAPL", today=TODAY + timedelta(days=400))[365].net_value == 0
+
+
+def test_top_net_buying_ranks_tickers():
+    store = InsiderStore()
+    store.record("AAPL", [transaction("AAPL", 5, 100)], today=TODAY)
+    store.record("MSFT", [transaction("MSFT", 5, 500)], today=TODAY, synced=True)
+    store.record("INTC", [transaction("INTC", 5, -500)], today=TODAY)
+
+    top = store.top_net_buying(30, 2, today=TODAY)
+    assert [(row.ticker, row.net_shares) for row in top] == [("MSFT", 500), ("AAPL", 100)]
+    # Rankings only cover tickers synced through /aggregates, so each row says how fresh it is
+    assert top[0].last_synced is not None and top[1].last_synced is None
+
+
+@pytest.fixture
+def paged_upstream(monkeypatch):
+    """Upstream filings newest first, honouring limit and the filing date bounds; several share each date."""
+    filings = [transaction("AAPL", i // 3, i + 1, name=f"Insider {i % 3}") for i in range(450)]
+    state = {"requests": [], "fail_after": None, "filings": filings}
+
+    def fake_fetch_json(endpoint, url, error_detail):
+        query = {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+        state["requests"].append(query)
+        if state["fail_after"] is not None and len(state["requests"]) > state["fail_after"]:
+            raise HTTPException(status_code=502, detail=error_detail)
+        rows = [
+            t for t in state["filings"]
+            if t.filing_date >= date.fromisoformat(query.get("filing_date_gte", "0001-01-01"))
+            and t.filing_date <= date.fromisoformat(query.get("filing_date_lte", "9999-12-31"))
+        ]
+        return {"insider_transactions": [t.model_dump() for t in rows[:int(query["limit"])]]}
+
+    store = InsiderStore()
+    store.record("AAPL", [transaction("AAPL", 400, 1)], today=TODAY)
+    monkeypatch.setattr(insider_transactions, "insider_store", store)
+    monkeypatch.setattr(insider_transactions, "fetch_json", fake_fetch_json)
+    monkeypatch.setattr(insider_transactions, "INSIDER_SYNC_LIMIT", 100)
+    return store, state
+
+
+def test_incremental_sync_pages_until_a_short_page(paged_upstream):
+    store, state = paged_upstream
+    assert insider_transactions.sync_insider_transactions("AAPL") == 450
+    assert store.transactions_held("AAPL") == 451
+    assert store.cursor("AAPL") == TODAY + timedelta(days=2)
+    # Each page repeats the rows filed on the previous page's oldest date
+    assert len(state["requests"]) == 5
+    assert "filing_date_lte" not in state["requests"][0]
+
+
+def test_failed_page_leaves_the_cursor_in_place(paged_upstream):
+    store, state = paged_upstream
+    cursor = store.cursor("AAPL")
+    state["fail_after"] = 2
+    with pytest.raises(HTTPException):
+        insider_transactions.sync_insider_transactions("AAPL")
+    assert (store.cursor("AAPL"), store.transactions_held("AAPL")) == (cursor, 1)
+
+
+def test_sync_holds_the_cursor_on_a_date_with_more_than_a_page_of_filings(paged_upstream):
+    store, state = paged_upstream
+    state["filings"] = (
+        [transaction("AAPL", day, 1, name="Newer") for day in range(50)]
+        + [transaction("AAPL", 60, i + 1, name=f"Insider {i}") for i in range(150)]
+        + [transaction("AAPL", day, 1, name="Older") for day in range(61, 81)]
+    )
+    assert insider_transactions.sync_insider_transactions("AAPL") == 170
+    # Only a page of the crowded date is reachable, but the filings filed before it are not skipped
+    assert store.has_seen("AAPL", state["filings"][-1])
+    crowded = TODAY - timedelta(days=58)
+    assert store.cursor("AAPL") == crowded
+
+    state["requests"].clear()
+    insider_transactions.sync_insider_transactions("AAPL", force=True)
+    assert state["requests"][0]["filing_date_gte"] == crowded.isoformat()
+
+
+def test_newest_first_batches_are_added_in_date_order():
+    store = InsiderStore()
+    store.record("AAPL", [transaction("AAPL", days_ago, 1) for days_ago in range(100)], today=TODAY)
+    trades = store.tickers["AAPL"].windows[365].trades
+    assert [trade.traded_on for trade in trades] == sorted(trade.traded_on for trade in trades)
+    assert len(trades) == 100
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import line_items
+from models import LineItemsPayload
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake line-items upstream that records every request payload."""
+    calls = []
+
+    def fake_fetch_json(endpoint, url, error_detail, payload=None):
+        calls.append(payload)
+        rows = []
+        for ticker in payload["tickers"]:
+            for year in range(payload["limit"]):
+                row = {"ticker": ticker, "report_period": f"{2024 - year}-12-31", "period": payload["period"]}
+                row.update({item: float(len(ticker) + year) for item in payload["line_items"]})
+                rows.append(row)
+        return {"search_results": rows}
+
+    line_items.cells.clear()
+    monkeypatch.setattr(line_items, "fetch_json", fake_fetch_json)
+    return calls
+
+
+def test_plan_chunks_balances_sizes():
+    chunks = line_items.plan_chunks([f"T{i}" for i in range(26)], max_chunk_size=25)
+    assert [len(chunk) for chunk in chunks] == [13, 13]
+    assert line_items.plan_chunks([], max_chunk_size=25) == []
+
+
+def test_overlapping_requests_only_fetch_missing_cells(upstream, monkeypatch):
+    monkeypatch.setattr(line_items, "LINE_ITEMS_CHUNK_SIZE", 2)
+    first = LineItemsPayload(line_items=["revenue"], tickers=["AAPL", "MSFT", "NVDA"], limit=2)
+    line_items.search_line_items(first)
+    assert sorted(len(call["tickers"]) for call in upstream) == [1, 2]
+
+    upstream.clear()
+    second = LineItemsPayload(line_items=["revenue", "net_income"], tickers=["AAPL", "GOOG"], limit=2)
+    response = line_items.search_line_items(second)
+
+    requested = {(call["tickers"][0], tuple(call["line_items"])) for call in upstream}
+    assert requested == {("AAPL", ("net_income",)), ("GOOG", ("revenue", "net_income"))}
+    assert [(row.ticker, row.report_period.year) for row in response.search_results] == [
+        ("AAPL", 2024), ("AAPL", 2023), ("GOOG", 2024), ("GOOG", 2023),
+    ]
+    assert response.search_results[0].model_extra == {"revenue": 4.0, "net_income": 4.0}
+
+
+def test_smaller_limit_is_served_from_cache(upstream):
+    line_items.search_line_items(LineItemsPayload(line_items=["revenue"], tickers=["AAPL"], limit=3))
+    upstream.clear()
+
+    response = line_items.search_line_items(LineItemsPayload(line_items=["revenue"], tickers=["AAPL"], limit=1))
+
+    assert upstream == []
+    assert len(response.search_results) == 1
+
+
+def test_streaming_returns_ndjson_rows(upstream):
+    client = TestClient(app)
+    response = client.post(
+        "/financials/financials/search/line-items?stream=true",
+        json={"line_items": ["revenue"], "tickers": ["AAPL", "MSFT"], "limit": 1},
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["ticker"] for row in rows) == ["AAPL", "MSFT"]
+    assert all("revenue" in row for row in rows)
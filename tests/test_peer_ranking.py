@@ -0,0 +1,121 @@
+import threading
+from datetime import date
+
+import pytest
+
+from app.agents.financial_metrics import FinancialMetrics
+from app.agents.vectorized_metrics import calculate_metric_arrays, flatten_metric_arrays, statement_columns
+from app.services.peer_ranking import PeerRanker
+from app.services.statement_store import StatementStore
+from models import BalanceSheetModel, CashFlowStatementModel, IncomeStatementModel
+
+
+def statements(ticker: str, net_income: float, total_assets: float = 1000.0, year: int = 2024):
+    common = dict(ticker=ticker, calendar_date=date(year, 12, 31), report_period=date(year, 12, 31), period="annual", currency="USD")
+    return [
+        IncomeStatementModel(
+            **common, revenue=800, cost_of_revenue=400, gross_profit=400, operating_expense=200,
+            operating_income=200, ebit=180, net_income=net_income, consolidated_income=net_income,
+            earnings_per_share=1.5, weighted_average_shares=100,
+        ),
+        BalanceSheetModel(
+            **common, total_assets=total_assets, current_assets=500, cash_and_equivalents=120, inventory=80,
+            trade_and_non_trade_receivables=90, outstanding_shares=100, total_liabilities=600,
+            current_liabilities=250, trade_and_non_trade_payables=70, shareholders_equity=400,
+        ),
+        CashFlowStatementModel(
+            **common, net_cash_flow_from_operations=210, depreciation_and_amortization=40,
+            net_cash_flow_from_investing=-90, net_cash_flow_from_financing=-60,
+            dividends_and_other_cash_distributions=-25, change_in_cash_and_equivalents=60,
+        ),
+    ]
+
+
+def test_vectorized_metrics_match_financial_metrics():
+    income, balance, cash_flow = statements("AAPL", net_income=120)
+    metrics = FinancialMetrics()
+    expected = {
+        "liquidity": metrics.calculate_liquidity_ratios(balance),
+        "ebitda": metrics.calculate_ebitda_ratios(income, cash_flow),
+        "leverage": metrics.calculate_leverage_ratios(balance),
+        "efficiency": metrics.calculate_efficiency_ratios(income, balance),
+        "profitability": metrics.calculate_profitability_ratios(income, balance),
+        "dupont": metrics.calculate_dupont_ratios(income, balance),
+        "economic_value": metrics.calculate_economic_value_ratios(income, balance, 0.08),
+        "stock_performance": metrics.calculate_stock_performance_ratios(income, balance, cash_flow, 150.0),
+    }
+    row = {**income.model_dump(), **balance.model_dump(), **cash_flow.model_dump()}
+    actual = flatten_metric_arrays(calculate_metric_arrays(statement_columns([row]), stock_price=150.0, cost_of_equity=0.08))
+
+    for category, values in expected.items():
+        for name, value in values.items():
+            assert actual[f"{category}.{name}"][0] == pytest.approx(value)
+
+
+@pytest.fixture
+def ranker():
+    store = StatementStore()
+    for ticker, net_income in (("AAA", 50), ("BBB", 100), ("CCC", 150), ("DDD", 200)):
+        store.record(statements(ticker, net_income))
+    return store, PeerRanker(store)
+
+
+def test_percentiles_and_top_k(ranker):
+    _, peer_ranker = ranker
+    index = peer_ranker.index_for("group", ["AAA", "BBB", "CCC", "DDD"])
+
+    metric = "profitability.return_on_assets"
+    assert index.size(metric) == 4
+    assert index.percentile(metric, "AAA") == pytest.approx(12.5)
+    assert index.percentile(metric, "DDD") == pytest.approx(87.5)
+    assert [ticker for ticker, _ in index.top(metric, 2)] == ["DDD", "CCC"]
+    assert [ticker for ticker, _ in index.bottom(metric, 1)] == ["AAA"]
+
+
+def test_new_statements_update_the_index_incrementally(ranker):
+    store, peer_ranker = ranker
+    index = peer_ranker.index_for(frozenset({"AAA", "BBB", "EEE"}), ["AAA", "BBB", "EEE"])
+    assert index.size("profitability.return_on_assets") == 2
+
+    store.record(statements("EEE", net_income=500))
+    store.record(statements("AAA", net_income=900, year=2025))
+
+    assert index.size("profitability.return_on_assets") == 3
+    assert [ticker for ticker, _ in index.top("profitability.return_on_assets", 3)] == ["AAA", "EEE", "BBB"]
+    assert peer_ranker.index_for(frozenset({"AAA", "BBB", "EEE"}), []) is index
+
+
+def test_metric_names_resolve_unless_ambiguous(ranker):
+    _, peer_ranker = ranker
+    assert peer_ranker.resolve_metric("current_ratio") == "liquidity.current_ratio"
+    assert peer_ranker.resolve_metric("dupont.leverage") == "dupont.leverage"
+    assert peer_ranker.resolve_metric("leverage") is None
+    assert peer_ranker.resolve_metric("earnings_per_share") == "stock_performance.earnings_per_share"
+    # Ranking on a made-up stock price or cost of equity would be meaningless
+    assert peer_ranker.resolve_metric("price_to_earnings_ratio") is None
+    assert peer_ranker.resolve_metric("economic_value.economic_margin") is None
+
+
+def test_statements_for_untracked_tickers_are_not_ranked_eagerly(ranker):
+    store, peer_ranker = ranker
+    peer_ranker.index_for("group", ["AAA", "BBB"])
+
+    store.record(statements("ZZZ", net_income=10))
+    assert "ZZZ" not in peer_ranker.vectors
+    store.record(statements("AAA", net_income=900, year=2025))
+    assert peer_ranker.vectors["AAA"]["profitability.return_on_assets"] == pytest.approx(0.9)
+
+
+def test_index_updates_wait_for_readers_holding_the_lock(ranker):
+    store, peer_ranker = ranker
+    index = peer_ranker.index_for("group", ["AAA", "BBB"])
+    metric = "profitability.return_on_assets"
+
+    with peer_ranker.lock:
+        writer = threading.Thread(target=store.record, args=(statements("AAA", net_income=900, year=2025),))
+        writer.start()
+        writer.join(timeout=0.2)
+        assert writer.is_alive()
+        assert [ticker for ticker, _ in index.top(metric, 2)] == ["BBB", "AAA"]
+    writer.join()
+    assert [ticker for ticker, _ in index.top(metric, 2)] == ["AAA", "BBB"]
@@ -0,0 +1,87 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.agents.growth_metrics import growth_metrics, lagged, report_months, ttm_columns
+from app.schemas.financial_metrics import MetricCategory
+from app.services import rollups
+from benchmarks.stub_server import report_period, statement
+from models import FinancialsModel
+
+QUARTER_ENDS = [date(2021 + (3 * i + 2) // 12, (3 * i + 2) % 12 + 1, 28) for i in range(16)]
+
+
+def quarterly_columns(revenue, net_income=None):
+    revenue = np.asarray(revenue, dtype=float)
+    return {
+        "revenue": revenue,
+        "net_income": revenue / 10 if net_income is None else np.asarray(net_income, dtype=float),
+        "gross_profit": revenue / 2,
+        "operating_income": revenue / 4,
+        "earnings_per_share": revenue / 100,
+        "net_cash_flow_from_operations": revenue / 5,
+        "total_assets": np.full(len(revenue), 1000.0),
+    }
+
+
+def test_ttm_is_a_sliding_four_quarter_sum():
+    months = report_months(QUARTER_ENDS[:6])
+    c = quarterly_columns([1, 2, 3, 4, 5, 6])
+    ttm = ttm_columns(c, months)
+    assert np.isnan(ttm["revenue"][:3]).all()
+    assert ttm["revenue"][3:].tolist() == [10, 14, 18]
+    # Balance sheet items are point-in-time and keep the quarter's value
+    assert ttm["total_assets"].tolist() == c["total_assets"].tolist()
+
+
+def test_gaps_in_the_series_invalidate_spanning_windows():
+    periods = QUARTER_ENDS[:3] + QUARTER_ENDS[4:8]
+    months = report_months(periods)
+    ttm = ttm_columns(quarterly_columns(np.arange(1, 8)), months)
+    assert np.isnan(ttm["revenue"][:6]).all()
+    assert ttm["revenue"][6] == 4 + 5 + 6 + 7
+    assert np.isnan(lagged(np.arange(7.0), months, 1)[3])
+
+
+def test_growth_rates_and_cagr():
+    months = report_months(QUARTER_ENDS)
+    # Revenue grows 10% every year, each quarter a quarter of the year
+    revenue = np.array([25 * 1.1 ** (i // 4) for i in range(16)])
+    c = quarterly_columns(revenue)
+    growth = growth_metrics(c, ttm_columns(c, months), months, cagr_years=3)
+
+    assert growth["revenue_yoy"][4:] == pytest.approx(0.1)
+    assert growth["revenue_qoq"][1:4] == pytest.approx(0.0)
+    assert growth["revenue_ttm_yoy"][7::4] == pytest.approx(0.1)
+    assert np.isnan(growth["revenue_cagr_3y"][:15]).all()
+    assert growth["revenue_cagr_3y"][15] == pytest.approx(0.1)
+    assert growth["gross_margin_ttm"][3:] == pytest.approx(0.5)
+    assert growth["gross_margin_change_yoy"][7:] == pytest.approx(0.0)
+
+
+def test_growth_from_a_loss_is_measured_against_its_magnitude():
+    months = report_months(QUARTER_ENDS[:2])
+    c = quarterly_columns([10, 10], net_income=[-4, -2])
+    growth = growth_metrics(c, ttm_columns(c, months), months, cagr_years=1)
+    assert growth["net_income_qoq"][1] == pytest.approx(0.5)
+
+
+def test_build_rollup_serves_quarterly_ttm_and_growth_from_one_series():
+    history = rollups.history_needed(limit=2, cagr_years=1)
+    financials = FinancialsModel(**{
+        kind: [statement(kind, "AAPL", "quarterly", i) for i in range(history)]
+        for kind in ("income_statements", "balance_sheets", "cash_flow_statements")
+    })
+    result = rollups.build_rollup("AAPL", financials, limit=2, stock_price=150, cagr_years=1)
+
+    assert [row.report_date for row in result.quarterly] == [report_period("quarterly", 0), report_period("quarterly", 1)]
+    assert [row.report_date for row in result.ttm] == [row.report_date for row in result.quarterly]
+    growth = next(group for group in result.quarterly[0].groups if group.category == MetricCategory.GROWTH)
+    assert growth.metrics["revenue_cagr_1y"] is not None
+
+    incomes = sorted(financials.income_statements, key=lambda s: s.report_period)[-4:]
+    ebitda = next(group for group in result.ttm[0].groups if group.category == MetricCategory.EBITDA)
+    cash_flows = sorted(financials.cash_flow_statements, key=lambda s: s.report_period)[-4:]
+    expected = sum(s.ebit for s in incomes) + sum(s.depreciation_and_amortization for s in cash_flows)
+    assert ebitda.metrics["ebitda"] == pytest.approx(expected)
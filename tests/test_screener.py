@@ -0,0 +1,114 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import screener
+from app.services.statement_store import StatementStore
+from config import SCREEN_HISTORY_LIMIT
+from models import BalanceSheetModel, FinancialSearchPayload, IncomeStatementModel
+
+
+def income_statement(ticker: str, year: int, revenue: float, net_income: float) -> IncomeStatementModel:
+    return IncomeStatementModel(
+        ticker=ticker, calendar_date=date(year, 12, 31), report_period=date(year, 12, 31), period="annual",
+        currency="USD", revenue=revenue, cost_of_revenue=revenue / 2, gross_profit=revenue / 2,
+        operating_expense=revenue / 4, operating_income=revenue / 4, ebit=revenue / 4, net_income=net_income,
+        consolidated_income=net_income, earnings_per_share=1.0, weighted_average_shares=100.0,
+    )
+
+
+def balance_sheet(ticker: str, year: int, total_assets: float) -> BalanceSheetModel:
+    return BalanceSheetModel(
+        ticker=ticker, calendar_date=date(year, 12, 31), report_period=date(year, 12, 31), period="annual",
+        currency="USD", total_assets=total_assets, current_assets=total_assets / 2, cash_and_equivalents=10.0,
+        total_liabilities=total_assets / 2, current_liabilities=total_assets / 4, shareholders_equity=total_assets / 2,
+    )
+
+
+@pytest.fixture
+def store():
+    store = StatementStore()
+    store.record([
+        income_statement("AAPL", 2023, revenue=380, net_income=95),
+        income_statement("AAPL", 2024, revenue=390, net_income=100),
+        income_statement("MSFT", 2024, revenue=240, net_income=85),
+        income_statement("INTC", 2024, revenue=55, net_income=-15),
+        balance_sheet("AAPL", 2024, total_assets=360),
+    ], limit=SCREEN_HISTORY_LIMIT)
+    return store
+
+
+def search(store, filters, **kwargs):
+    payload = FinancialSearchPayload(filters=filters, **kwargs)
+    return [(row.ticker, row.report_period.year) for row in screener.screen(payload, store).search_results]
+
+
+def test_range_filters_are_intersected(store):
+    filters = [
+        {"field": "revenue", "operator": "gte", "value": 240},
+        {"field": "net_income", "operator": "lt", "value": 100},
+    ]
+    assert search(store, filters) == [("AAPL", 2023), ("MSFT", 2024)]
+
+
+def test_order_limit_and_ticker_restriction(store):
+    filters = [{"field": "net_income", "operator": "gt", "value": 0}]
+    assert search(store, filters, order="desc", limit=2) == [("MSFT", 2024), ("AAPL", 2024)]
+    assert search(store, filters, tickers=["AAPL"]) == [("AAPL", 2023), ("AAPL", 2024)]
+    assert search(store, [], order="desc", limit=1, tickers=["INTC"]) == [("INTC", 2024)]
+
+
+def test_restated_values_are_reindexed(store):
+    store.record([income_statement("INTC", 2024, revenue=55, net_income=5)])
+    assert search(store, [{"field": "net_income", "operator": "lt", "value": 0}]) == []
+
+
+def test_missing_tickers_depend_on_filtered_statements(store):
+    payload = FinancialSearchPayload(filters=[{"field": "total_assets", "operator": "gt", "value": 0}], tickers=["AAPL", "MSFT"])
+    assert screener.missing_tickers(payload, store) == ["MSFT"]
+
+
+
+def test_open_screens_are_never_answered_locally(store):
+    # The store only holds what other routes fetched, not the whole upstream universe
+    assert screener.can_screen_locally(FinancialSearchPayload(filters=[{"field": "revenue", "operator": "gt", "value": 0}])) is False
+    assert screener.can_screen_locally(FinancialSearchPayload(filters=[], tickers=["AAPL"])) is True
+
+
+def test_store_evicts_least_recently_used_tickers():
+    store = StatementStore(max_tickers=2)
+    store.record([income_statement("AAPL", 2024, revenue=390, net_income=100)])
+    store.record([income_statement("MSFT", 2024, revenue=240, net_income=85)])
+    assert store.has_statements("AAPL", "annual", ["income_statements"])
+    store.record([income_statement("INTC", 2024, revenue=55, net_income=-15)])
+
+    assert not store.has_statements("MSFT", "annual", ["income_statements"])
+    assert store.rows_for("MSFT", "annual") == []
+    assert search(store, [{"field": "revenue", "operator": "gt", "value": 0}]) == [("AAPL", 2024), ("INTC", 2024)]
+
+
+def test_stale_tickers_are_dropped_and_refetched(store, monkeypatch):
+    assert store.fetched_at("AAPL", "annual") is not None
+    store.ttl = 60
+    monkeypatch.setattr("app.services.statement_store.time.time", lambda: store.fetched_at("AAPL", "annual") + 61)
+    assert not store.has_statements("AAPL", "annual", ["income_statements"])
+    assert search(store, [], tickers=["AAPL"]) == []
+    assert len(store) == 2
+
+
+def test_invalid_filters_are_rejected(store):
+    with pytest.raises(HTTPException) as error:
+        search(store, [{"field": "not_a_field", "operator": "gt", "value": 1}])
+    assert error.value.status_code == 400
+
+
+def test_tickers_held_with_short_history_are_refetched():
+    store = StatementStore()
+    # Fetched by a route that asked for one period only
+    store.record([income_statement("AAPL", 2024, revenue=390, net_income=100)], limit=1)
+    # Upstream had just two periods for a five-period request; nothing more to fetch
+    store.record([income_statement("NEW", 2023, 1, 1), income_statement("NEW", 2024, 2, 1)], limit=5)
+
+    payload = FinancialSearchPayload(filters=[], tickers=["AAPL", "NEW"])
+    assert screener.missing_tickers(payload, store) == ["AAPL"]
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from app.services.segment_pivot import pivot
+from models import SegmentedFinancialModel, SegmentedItemModel
+
+
+def segmented(year: int, items):
+    return SegmentedFinancialModel(
+        ticker="AAPL",
+        report_period=date(year, 9, 30),
+        period="annual",
+        items=[SegmentedItemModel(axis=axis, key=key, value=value, period="annual") for axis, key, value in items],
+    )
+
+
+def test_pivot_sums_shares_and_growth():
+    product, region = "srt:ProductOrServiceAxis", "us-gaap:StatementBusinessSegmentsAxis"
+    result = pivot("AAPL", "annual", [
+        # Upstream returns the newest period first
+        segmented(2024, [(product, "iPhone", 200), (product, "Services", 100), (region, "Americas", 300)]),
+        segmented(2023, [(product, "iPhone", 100), (product, "iPhone", 50), (region, "Americas", 150)]),
+    ])
+
+    assert result.report_periods == [date(2023, 9, 30), date(2024, 9, 30)]
+    products = next(axis for axis in result.axes if axis.axis == product)
+    assert products.totals == [150, 300]
+
+    iphone, services = products.segments
+    assert (iphone.key, iphone.values) == ("iPhone", [150, 200])
+    assert iphone.share_of_total == pytest.approx([1.0, 2 / 3])
+    assert iphone.growth[0] is None and iphone.growth[1] == pytest.approx(1 / 3)
+    assert services.values == [None, 100]
+    assert services.share_of_total[0] is None and services.growth == [None, None]
+
+    regions = next(axis for axis in result.axes if axis.axis == region)
+    assert [segment.key for segment in regions.segments] == ["Americas"]
+
+
+def test_growth_of_a_negative_segment_matches_the_metric_rollups():
+    axis = "us-gaap:StatementBusinessSegmentsAxis"
+    result = pivot("AAPL", "annual", [
+        segmented(2024, [(axis, "Eliminations", -5)]),
+        segmented(2023, [(axis, "Eliminations", -10)]),
+    ])
+    # A shrinking negative value is growth, as in growth_metrics.change
+    assert result.axes[0].segments[0].growth[1] == pytest.approx(0.5)
@@ -0,0 +1,48 @@
+import pytest
+
+from app.agents.financial_metrics import FinancialMetrics
+from app.schemas.sensitivity import SensitivityPayload
+from app.services import sensitivity
+from benchmarks.stub_server import statement
+from models import FinancialsModel
+
+
+def financials(periods: int) -> FinancialsModel:
+    return FinancialsModel(**{
+        kind: [statement(kind, "AAPL", "annual", i) for i in range(periods)]
+        for kind in ("income_statements", "balance_sheets", "cash_flow_statements")
+    })
+
+
+def test_grid_matches_financial_metrics_at_every_point():
+    data = financials(3)
+    payload = SensitivityPayload(stock_price=[80, 150], cost_of_equity={"start": 0.05, "stop": 0.15, "num": 3}, limit=3)
+    names, _ = sensitivity.resolve_metrics(None)
+    result = sensitivity.build_sensitivity("AAPL", data, payload, names)
+
+    metrics = FinancialMetrics()
+    for p, (income, balance, cash_flow) in enumerate(zip(data.income_statements, data.balance_sheets, data.cash_flow_statements)):
+        assert result.report_date[p] == income.report_period
+        for c, cost_of_equity in enumerate(result.cost_of_equity):
+            expected = metrics.calculate_economic_value_ratios(income, balance, cost_of_equity)
+            assert result.metrics["economic_value.economic_margin"].values[p][c] == pytest.approx(expected["economic_margin"])
+        for s, stock_price in enumerate(result.stock_price):
+            expected = metrics.calculate_stock_performance_ratios(income, balance, cash_flow, stock_price)
+            assert result.metrics["stock_performance.market_value_added"].values[p][s] == pytest.approx(expected["market_value_added"])
+            assert result.metrics["stock_performance.price_to_earnings_ratio"].values[p][s] == pytest.approx(expected["price_to_earnings_ratio"])
+
+
+def test_each_metric_keeps_only_the_axes_it_varies_along():
+    payload = SensitivityPayload(stock_price={"start": 50, "stop": 250, "num": 100}, cost_of_equity=[0.08], limit=10)
+    names, _ = sensitivity.resolve_metrics(["economic_margin", "market_value", "earnings_per_share"])
+    result = sensitivity.build_sensitivity("AAPL", financials(10), payload, names)
+
+    assert result.metrics["economic_value.economic_margin"].axes == ["report_date"]
+    assert result.metrics["stock_performance.earnings_per_share"].axes == ["report_date"]
+    market_value = result.metrics["stock_performance.market_value"]
+    assert market_value.axes == ["report_date", "stock_price"]
+    assert len(market_value.values) == 10 and len(market_value.values[0]) == 100
+
+
+def test_resolve_metrics_rejects_metrics_outside_the_grid():
+    assert sensitivity.resolve_metrics(["economic_margin", "leverage"]) == (["economic_value.economic_margin"], ["leverage"])
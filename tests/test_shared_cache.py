@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from app.core import upstream
+from app.core.cache import FileCache
+
+WORKERS = 6
+
+
+def load_once(directory, counter_path, barrier, results):
+    """One worker process: wait for the others, then race for the same key."""
+    cache = FileCache(directory, max_entries=16, ttl=60)
+
+    def loader():
+        with open(counter_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.2)
+        return {"ticker": "AAPL", "loaded_by": os.getpid()}
+
+    barrier.wait()
+    results.put(cache.get_or_set("AAPL", loader))
+
+
+def test_get_or_set_loads_once_across_processes(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(WORKERS)
+    results = context.Queue()
+    counter_path = str(tmp_path / "loads")
+    workers = [
+        context.Process(target=load_once, args=(str(tmp_path / "cache"), counter_path, barrier, results))
+        for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    values = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+
+    with open(counter_path) as f:
+        assert len(f.read().split()) == 1
+    assert all(value == values[0] for value in values)
+
+
+def test_entries_expire_and_overwrite_atomically(tmp_path):
+    cache = FileCache(str(tmp_path), max_entries=16, ttl=60)
+    cache.set("key", b"first")
+    cache.set("key", b"second")
+    assert cache.get("key") == b"second"
+    assert len(cache) == 1
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+    cache.set("short", 1, ttl=-1)
+    assert cache.get("short", "missing") == "missing"
+    assert len(cache) == 1
+
+
+def test_trim_evicts_least_recently_read(tmp_path):
+    cache = FileCache(str(tmp_path), max_entries=4, ttl=60)
+    for i in range(4):
+        cache.set(i, i)
+        os.utime(cache._path(i), (i, i))
+    cache.get(0)
+    cache.set(4, 4)
+    cache.trim()
+    assert len(cache) == 4
+    assert cache.get(0) == 0
+    assert cache.get(1) is None
+
+
+def test_cache_directory_must_be_private(tmp_path):
+    FileCache(str(tmp_path / "new"))
+    assert os.stat(tmp_path / "new").st_mode & 0o777 == 0o700
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    # Anyone able to write here could plant a pickle that runs code when loaded
+    with pytest.raises(PermissionError):
+        FileCache(str(shared))
+
+def test_fresh_upstream_entries_skip_the_network(tmp_path, monkeypatch):
+    calls = []
+
+    class FakeResponse:
+        status_code = 200
+        content = b'{"prices": []}'
+        headers = {}
+
+        def json(self):
+            return {"prices": []}
+
+    def fake_get(url, headers=None, timeout=None):
+        calls.append((url, timeout))
+        return FakeResponse()
+
+    monkeypatch.setattr(upstream, "responses", FileCache(str(tmp_path), max_entries=16, ttl=60))
+    monkeypatch.setattr(upstream, "UPSTREAM_FRESH_TTL", 60)
+    monkeypatch.setattr(upstream.session, "get", fake_get)
+
+    first = upstream.fetch_json("prices", "https://example.test/prices", "error")
+    second = upstream.fetch_json("prices", "https://example.test/prices", "error")
+    assert first == second == {"prices": []}
+    assert calls == [("https://example.test/prices", upstream.UPSTREAM_TIMEOUT)]
@@ -0,0 +1,13 @@
+import math
+
+from benchmarks.startup import MAX_MODULES, MAX_RSS_MB, check, measure, measure_once
+
+
+def test_app_main_does_not_import_heavy_modules():
+    # Agent (LangChain/OpenAI), ML and dataframe stacks load on first use only
+    assert measure_once()["heavy_modules"] == []
+
+
+def test_app_main_stays_within_the_memory_and_module_budgets():
+    # Import time varies too much between machines to assert here; `task bench-startup` checks it
+    assert check(measure(runs=1), max_import_ms=math.inf, max_rss_mb=MAX_RSS_MB, max_modules=MAX_MODULES) == []
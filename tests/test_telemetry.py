@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+from app.core import telemetry
+from app.core.telemetry import Registry, span
+from app.main import app
+
+
+def test_span_records_histogram():
+    telemetry.registry.reset()
+    with span("json_decode", endpoint="prices"):
+        pass
+
+    rendered = telemetry.registry.render()
+    assert '# TYPE ai_fund_stage_duration_seconds histogram' in rendered
+    assert 'ai_fund_stage_duration_seconds_count{stage="json_decode",endpoint="prices"} 1' in rendered
+    assert 'ai_fund_stage_duration_seconds_bucket{stage="json_decode",endpoint="prices",le="+Inf"} 1' in rendered
+
+
+def test_counter_rendering_escapes_labels():
+    registry = Registry()
+    registry.increment("ai_fund_upstream_requests_total", labels=(("endpoint", 'a"b'),))
+    registry.increment("ai_fund_upstream_requests_total", labels=(("endpoint", 'a"b'),))
+
+    assert 'ai_fund_upstream_requests_total{endpoint="a\\"b"} 2' in registry.render()
+
+
+def test_span_overhead_is_negligible():
+    # A span wraps network calls measured in milliseconds; keep it well under that
+    assert telemetry.measure_span_overhead(iterations=5_000) < 50e-6
+
+
+def test_telemetry_endpoint_exposes_request_latency():
+    telemetry.registry.reset()
+    client = TestClient(app)
+
+    client.get("/internal/telemetry")
+    response = client.get("/internal/telemetry")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/internal/telemetry"' in response.text